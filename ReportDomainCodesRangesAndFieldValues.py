@@ -5,106 +5,119 @@
 
 # Import arcpy module
 import arcpy, string, os, datetime, time
-import openpyxl
-from openpyxl import Workbook
-from openpyxl.styles import Font
+import xlsxwriter
 from os.path import basename
 start = time.time()
 
+# Field and domain types that have their codes and values listed in the report
+stringTypes = ("String", "Text")
+numericTypes = ("Double", "Integer", "SmallInteger", "Long", "Short")
+
+
+def joinValues(values, valueType):
+    # Decide once how to handle the type, then join all values with a comma
+    if valueType not in stringTypes and valueType not in numericTypes:
+        return ""
+    return ",".join([str(value) for value in values])
+
+
+def writeCells(wSheet, rowNum, row):
+    # Write text as plain strings (no url, formula or number conversion) and cut
+    # values that are too long for an Excel cell, warning for any cell not written
+    for col, value in enumerate(row):
+        if isinstance(value, str):
+            if len(value) > maxCellChars:
+                arcpy.AddWarning("{} row {} column {} has {} characters, truncated to the "
+                                 "Excel cell limit".format(wSheet.name, rowNum + 1, col + 1, len(value)))
+                value = value[:maxCellChars - len(truncatedMarker)] + truncatedMarker
+            result = wSheet.write_string(rowNum, col, value)
+        else:
+            result = wSheet.write(rowNum, col, value)
+        if result < 0:
+            arcpy.AddWarning("{} row {} column {} could not be written (error {})".format(
+                wSheet.name, rowNum + 1, col + 1, result))
+
+
 # Local variables:
 ws = arcpy.GetParameterAsText(0)
 outFile = arcpy.GetParameterAsText(1)
 if '.xlsx' not in outFile:
     outFile = outFile + '.xlsx'
 
-# Create Workbook
-wBook = Workbook()
+# Create Workbook (constant memory mode flushes each row to disk as it is written),
+# values are written as they are rather than converted to urls, formulas or numbers
+wBook = xlsxwriter.Workbook(outFile, {"constant_memory": True, "strings_to_numbers": False,
+                                      "strings_to_urls": False, "strings_to_formulas": False})
+# Create a format for the bold header cells
+headerFormat = wBook.add_format({"bold": True})
+# Sheet names already used (lower case, Excel sheet names are case insensitive)
+sheetNames = set()
+# Max column width so long lists of field values don't stretch the column
+maxColWidth = 60
+# Max number of characters in an Excel cell, longer lists are cut and marked
+maxCellChars = 32767
+truncatedMarker = "...(truncated)"
 
 # loop through all the feature classes and tables in the workspace
-ctr = 1
-
 domains = arcpy.da.ListDomains(ws)
+# Look up domains by name and keep each domain's coded values once it has been read
+domainsByName = {domain.name: domain for domain in domains}
+codesByName = {}
 walk = arcpy.da.Walk(ws, datatype=["FeatureClass", "Table"])
 for dirpath, dirname, filenames in walk:
     for filename in filenames:
         item = os.path.join(dirpath, filename)
-        record_count = arcpy.GetCount_management(item)
         desc = arcpy.Describe(item)
         splitList = desc.baseName.split('.')
         fcName = splitList[-1]
         arcpy.AddMessage("Working on " + fcName)
 
-        # Create Worksheet
-        wBook.create_sheet(fcName)
-        wSheet = wBook[fcName]
+        # Create Worksheet (sheet names have a char limit of 31 chars and must be unique)
+        sheetName = fcName[:31]
+        sheetNum = 1
+        while sheetName.lower() in sheetNames:
+            sheetName = fcName[:31 - len(str(sheetNum))] + str(sheetNum)
+            sheetNum += 1
+        sheetNames.add(sheetName.lower())
+        wSheet = wBook.add_worksheet(sheetName)
         # If feature class is empty, change the color of the Sheet to Red
-        result = arcpy.GetCount_management(item)
-        count = int(result.getOutput(0))
+        count = int(arcpy.management.GetCount(item)[0])
         if count == 0:
-            wSheet.sheet_properties.tabColor = "FF0000"
+            wSheet.set_tab_color("#FF0000")
 
         subtype_field_name = desc.subtypeFieldName
         if not subtype_field_name:
             arcpy.AddMessage(fcName + " does not have a subtype field.")
-            # Write header
-            wSheet["A1"] = "Feature Class or Table"
-            wSheet["B1"] = "Field Name"
-            wSheet["C1"] = "Domain Name"
-            wSheet["D1"] = "Domain Codes or Range"
-            wSheet["E1"] = "Field Values"
+            # Header
+            header = ("Feature Class or Table", "Field Name", "Domain Name", "Domain Codes or Range", "Field Values")
+            rows = []
             flds = arcpy.ListFields(item)
-            rowCtr = 2
             for fld in flds:
                 if fld.domain != "":
-                    for domain in domains:
-                        if domain.name == fld.domain and domain.domainType == "CodedValue":
-                            codes = ""
-                            for code, desc in domain.codedValues.items():
-                                if fld.type == "String":
-                                    codes = codes + "," + code
-                                if fld.type in ("Double", "Integer", "SmallInteger", "Long"):
-                                    codes = codes + "," + str(code)
-
-                        if domain.name == fld.domain and domain.domainType == "Range":
-                            codes = ""
-                            min_range = domain.range[0]
-                            max_range = domain.range[1]
-                            codes = codes + "," + str(min_range) + "-" + str(max_range)
-                    codes = codes[1:]
-
-                    fldValues = ""
-                    arcpy.analysis.Frequency(item, "in_memory" + "\\tbl" + str(ctr), fld.name)
-                    with arcpy.da.SearchCursor("in_memory" + "\\tbl" + str(ctr), fld.name) as cursor:
-                        for row in cursor:
-                            fldValue = row[0]
-                            if fldValue == None:
-                                fldValue = "Null"
-                            if fld.type == "String":
-                                fldValues = fldValues + "," + fldValue
-                            if fld.type in ("Double", "Integer", "SmallInteger"):
-                                fldValues = fldValues + "," + str(fldValue)
-                    ctr += 1
-                    fldValues = fldValues[1:]
-
-                    wSheet["A" + str(rowCtr)] = fcName
-                    wSheet["B" + str(rowCtr)] = fld.name
-                    wSheet["C" + str(rowCtr)] = fld.domain
-                    wSheet["D" + str(rowCtr)] = codes
-                    wSheet["E" + str(rowCtr)] = fldValues
-                    rowCtr += 1
+                    codes = ""
+                    domain = domainsByName.get(fld.domain)
+                    if domain is not None and domain.domainType == "CodedValue":
+                        if domain.name not in codesByName:
+                            codesByName[domain.name] = list(domain.codedValues.keys())
+                        codes = joinValues(codesByName[domain.name], fld.type)
+
+                    if domain is not None and domain.domainType == "Range":
+                        min_range = domain.range[0]
+                        max_range = domain.range[1]
+                        codes = f"{min_range}-{max_range}"
+
+                    with arcpy.da.SearchCursor(item, [fld.name], sql_clause=("DISTINCT", "ORDER BY " + fld.name)) as cursor:
+                        fldValues = joinValues(["Null" if row[0] is None else row[0] for row in cursor], fld.type)
+
+                    rows.append((fcName, fld.name, fld.domain, codes, fldValues))
 
         else:
             arcpy.AddMessage(fcName + " feature class has a subtype field.")
-            # Write header
-            wSheet["A1"] = "Feature Class or Table"
-            wSheet["B1"] = "Subtype Code"
-            wSheet["C1"] = "Subtype Description"
-            wSheet["D1"] = "Field Name"
-            wSheet["E1"] = "Domain Name"
-            wSheet["F1"] = "Domain Codes or Range"
-            wSheet["G1"] = "Field Values"
+            # Header
+            header = ("Feature Class or Table", "Subtype Code", "Subtype Description", "Field Name", "Domain Name",
+                      "Domain Codes or Range", "Field Values")
+            rows = []
             subtypes = arcpy.da.ListSubtypes(item)
-            rowCtr = 2
 
             for stcode, stdict in list(subtypes.items()):
                 for stkey in list(stdict.keys()):
@@ -114,76 +127,46 @@ for dirpath, dirname, filenames in walk:
                         fields = stdict[stkey]
                         for field, fieldvals in list(fields.items()):
                             if fieldvals[1] is not None:
-                                for domain in domains:
-                                    if domain.name == fieldvals[1].name and fieldvals[1].domainType == "CodedValue":
-                                        domainName = domain.name
-                                        codes = ""
-                                        for code, desc in domain.codedValues.items():
-                                            if fieldvals[1].type == "Text":
-                                                codes = codes + "," + code
-                                            if fieldvals[1].type in ("Double", "Short", "Long"):
-                                                codes = codes + "," + str(code)
-
-                                    if domain.name == fieldvals[1].name and fieldvals[1].domainType == "Range":
-                                        domainName = domain.name
-                                        codes = ""
-                                        min_range = domain.range[0]
-                                        max_range = domain.range[1]
-                                        codes = codes + "," + str(min_range) + "-" + str(max_range)
-                                codes = codes[1:]
-
-                                fldValues = ""
-                                arcpy.analysis.Frequency(item, "in_memory" + "\\tbl" + str(ctr), field)
-                                with arcpy.da.SearchCursor("in_memory" + "\\tbl" + str(ctr), field) as cursor:
-                                    for row in cursor:
-                                        fldValue = row[0]
-                                        if fldValue == None:
-                                            fldValue = "Null"
-                                        if fld.type == "String":
-                                            fldValues = fldValues + "," + str(fldValue)
-                                        if fld.type in ("Double", "Integer", "SmallInteger", "Long"):
-                                            fldValues = fldValues + "," + str(fldValue)
-                                fldValues = fldValues[1:]
-                                ctr += 1
-
-                                wSheet["A" + str(rowCtr)] = fcName
-                                wSheet["B" + str(rowCtr)] = stcode
-                                wSheet["C" + str(rowCtr)] = sTypeCode
-                                wSheet["D" + str(rowCtr)] = field
-                                wSheet["E" + str(rowCtr)] = domainName
-                                wSheet["F" + str(rowCtr)] = codes
-                                wSheet["G" + str(rowCtr)] = fldValues
-                                rowCtr += 1
+                                # ListSubtypes returns the domain object itself
+                                codes = ""
+                                domain = fieldvals[1]
+                                domainName = domain.name
+                                if domain.domainType == "CodedValue":
+                                    if domain.name not in codesByName:
+                                        codesByName[domain.name] = list(domain.codedValues.keys())
+                                    codes = joinValues(codesByName[domain.name], domain.type)
+
+                                if domain.domainType == "Range":
+                                    min_range = domain.range[0]
+                                    max_range = domain.range[1]
+                                    codes = f"{min_range}-{max_range}"
+
+                                # Field type matches the domain type
+                                with arcpy.da.SearchCursor(item, [field], sql_clause=("DISTINCT", "ORDER BY " + field)) as cursor:
+                                    fldValues = joinValues(["Null" if row[0] is None else row[0] for row in cursor], domain.type)
+
+                                rows.append((fcName, stcode, sTypeCode, field, domainName, codes, fldValues))
 
 
 
         # Freeze the first column and row
-        c = wSheet['B2']
-        wSheet.freeze_panes = c
-        # set first row to be Bold
-        bold_font = Font(bold=True)
-        for cell in wSheet["1:1"]:
-            cell.font = bold_font
+        wSheet.freeze_panes(1, 1)
+        # Write first row in bold, then the staged rows (rows must be written in order)
+        # and keep track of the width of each column
+        wSheet.write_row(0, 0, header, headerFormat)
+        colWidths = [min(len(h), maxColWidth) for h in header]
+        for rowNum, row in enumerate(rows, 1):
+            writeCells(wSheet, rowNum, row)
+            for i, value in enumerate(row):
+                if colWidths[i] < maxColWidth:
+                    colWidths[i] = min(max(colWidths[i], len(str(value))), maxColWidth)
 
         # Adjust the width of each column
-        for col in wSheet.columns:
-            max_length = 0
-            column = col[0].column_letter  # Get the column name
-            for cell in col:
-                try:
-                    if len(str(cell.value)) > max_length:
-                        max_length = len(str(cell.value))
-                except:
-                    pass
-            adjusted_width = (max_length + 2)
-            wSheet.column_dimensions[column].width = adjusted_width
-
-
-# Delete the first sheet named Sheet
-if 'Sheet' in wBook.sheetnames:
-    sheet_to_delete = wBook['Sheet']
-    wBook.remove(sheet_to_delete)
-wBook.save(outFile)
+        for i, max_length in enumerate(colWidths):
+            wSheet.set_column(i, i, max_length + 2)
+
+
+wBook.close()
 
 end = time.time()
 elapsed = int((end-start)/60)
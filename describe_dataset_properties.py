@@ -36,56 +36,45 @@ Updates:
 import arcpy
 import os
 import openpyxl
+from openpyxl.cell import WriteOnlyCell
+from openpyxl.styles import Font, NamedStyle
 from openpyxl.utils import get_column_letter
 
 # Overwrite existing output
 arcpy.env.overwriteOutput = 1
 
+# Named style for bold header cells
+header_style = NamedStyle(name="header", font=Font(bold=True))
+
 
 def log_it(message):
     print(message)
     arcpy.AddMessage(message)
 
 
-def autofit_column_widths(ws):
-    for col in ws.columns:
-        max_length = 0
-        column = get_column_letter(
-            col[0].column
-        )  # Get column letter from the first cell in the column
-        for cell in col:
-            try:
-                if len(str(cell.value)) > max_length:
-                    max_length = len(str(cell.value))
-            except (
-                TypeError
-            ):  # Handle cases where cell.value might be None or not easily convertible to string
-                pass
-        adjusted_width = max_length + 2  # Add some padding
-        ws.column_dimensions[column].width = adjusted_width
-
-
 # Tool inputs
 in_ws = arcpy.GetParameterAsText(0)
 out_xls = arcpy.GetParameterAsText(1)
 
-# Create new workbook and define header
-wb = openpyxl.Workbook()
-ws = wb.active
-ws["A1"] = "Feature Dataset"
-ws["B1"] = "Feature Class/Table"
-ws["C1"] = "Has Esri GlobalID"
-ws["D1"] = "GlobalID Field Name"
-ws["E1"] = "GlobalID Type"
-ws["F1"] = "Editor Tracking Enabled"
-ws["G1"] = "Creator Field"
-ws["H1"] = "Date Created Field"
-ws["I1"] = "Edited By Field"
-ws["J1"] = "Edited Date Field"
-ws["K1"] = "Coordinate System"
-ws["L1"] = "WKID"
-ws["M1"] = "Linear Units"
-ws["N1"] = "Vertical CS"
+# Define header
+headers = [
+    "Feature Dataset",
+    "Feature Class/Table",
+    "Has Esri GlobalID",
+    "GlobalID Field Name",
+    "GlobalID Type",
+    "Editor Tracking Enabled",
+    "Creator Field",
+    "Date Created Field",
+    "Edited By Field",
+    "Edited Date Field",
+    "Coordinate System",
+    "WKID",
+    "Linear Units",
+    "Vertical CS",
+]
+# Track max length of each column as records are added
+col_widths = [len(h) for h in headers]
 
 # Set workspace environment
 arcpy.env.workspace = in_ws
@@ -93,34 +82,51 @@ arcpy.env.workspace = in_ws
 # Initialize list to store data properties
 records = []
 
+# Walk the workspace once to group feature classes/tables by feature dataset
+# {fds: [dataset paths]}, stand-alone datasets are grouped under ""
+ds_dict = {}
+for dirpath, dirnames, filenames in arcpy.da.Walk(
+    in_ws, datatype=["FeatureClass", "Table"]
+):
+    if os.path.normpath(dirpath) == os.path.normpath(in_ws):
+        fds = ""
+    else:
+        fds = os.path.basename(dirpath)
+    ds_dict.setdefault(fds, []).extend(
+        os.path.join(dirpath, filename) for filename in filenames
+    )
+
 # Loop through all feature classes/tables in gdb and in all feature datasets
-fds_list = arcpy.ListDatasets(feature_type="Feature")
-fds_list.sort()
+fds_list = sorted(fds for fds in ds_dict if fds)
 fds_list.append("")
 for fds in fds_list:
+    # Describe each dataset once {dataset path: describe object}
+    desc_dict = {path: arcpy.Describe(path) for path in ds_dict.get(fds, [])}
     # Get feature classes/tables
     if fds == "":
         log_it(f"Processing stand-alone datasets")
         fds = "<standalone>"
-        fc_list = arcpy.ListFeatureClasses()
-        tbl_list = arcpy.ListTables()
-        fc_list.sort()
-        tbl_list.sort()
-        ds_list = fc_list + tbl_list
+        # Sort feature classes then tables alphabetically
+        ds_list = sorted(
+            desc_dict,
+            key=lambda path: (
+                desc_dict[path].dataType != "FeatureClass",
+                os.path.basename(path),
+            ),
+        )
     else:
         log_it(f"Processing feature dataset: {fds}")
-        ds_list = arcpy.ListFeatureClasses(feature_dataset=fds)
-        ds_list.sort()
+        ds_list = sorted(desc_dict, key=os.path.basename)
 
-    for ds in ds_list:
+    for path in ds_list:
+        ds = os.path.basename(path)
         log_it(f"Processing dataset: {ds}")
-        # Describe dataset to get properties
-        desc = arcpy.Describe(ds)
+        # Get describe properties
+        desc = desc_dict[path]
 
         # Get spatial reference properties
         try:
             spatial_ref = desc.spatialReference
-            sr_name = spatial_ref.name
             coord_system = spatial_ref.type
             wkid = spatial_ref.factoryCode
             vertical_cs = spatial_ref.VCS.name
@@ -130,21 +136,16 @@ for fds in fds_list:
                 linear_units = spatial_ref.linearUnitName
             if not vertical_cs:
                 vertical_cs = "None"
-        except:
-            spatial_ref = ""
-            sr_name = ""
+        except Exception:
+            # Tables don't have a spatial reference
             coord_system = ""
             wkid = ""
-            vertical_cs = ""
             linear_units = ""
             vertical_cs = ""
-            pass
 
-        # Get GlobalID field info
+        # Get GlobalID field info from the describe fields (no need to list fields)
         has_globalid = desc.HasGlobalID
-        globalid_fld = [
-            fld for fld in arcpy.ListFields(ds) if fld.name.lower() == "globalid"
-        ]
+        globalid_fld = [fld for fld in desc.fields if fld.name.lower() == "globalid"]
         if globalid_fld:
             globalid_type = globalid_fld[0].type
             globalid_fld = globalid_fld[0].name
@@ -183,27 +184,37 @@ for fds in fds_list:
             vertical_cs,
         )
         records.append(val_tuple)
+        for i, v in enumerate(val_tuple):
+            col_widths[i] = max(col_widths[i], len(str(v)))
     records.append("")
 
 # Write results to excel
 if records:
-    row = 2
+    # Create new workbook (write-only mode streams rows to disk as they are appended)
+    wb = openpyxl.Workbook(write_only=True)
+    wb.add_named_style(header_style)
+    ws = wb.create_sheet("Sheet")
+
+    # Apply autofit to all columns and freeze first row (must be set before rows are written)
+    for i, max_length in enumerate(col_widths):
+        adjusted_width = max_length + 2  # Add some padding
+        ws.column_dimensions[get_column_letter(i + 1)].width = adjusted_width
+    ws.freeze_panes = "A2"
+
+    # Write bold header row
+    header_cells = []
+    for h in headers:
+        cell = WriteOnlyCell(ws, value=h)
+        cell.style = header_style.name
+        header_cells.append(cell)
+    ws.append(header_cells)
+
     for val in records:
         if val == "":
-            row += 1
+            # Blank row between feature datasets
+            ws.append([])
         else:
-            for i in range(0, len(val)):
-                ws.cell(row=row, column=i + 1, value=val[i])
-            row += 1
-
-    # Bold and freeze first row
-    bold_font = openpyxl.styles.Font(bold=True)
-    for cell in ws[1]:
-        cell.font = bold_font
-    ws.freeze_panes = "A2"
-
-    # Apply autofit to all columns
-    autofit_column_widths(ws)
+            ws.append(val)
 
     # Save excel
     wb.save(out_xls)
@@ -33,13 +33,30 @@ import os
 import numbers
 import re
 import difflib
+import heapq
 import openpyxl
-from openpyxl.styles import PatternFill, Color
+from openpyxl.cell import WriteOnlyCell
+from openpyxl.styles import Font, NamedStyle, PatternFill, Color
 from openpyxl.utils import get_column_letter
 
 # Overwrite existing output
 arcpy.env.overwriteOutput = 1
 
+# Pattern for sheet names that end with a number
+_SHEET_NUM_RE = re.compile(r"_\d+$")
+
+# Named styles for bold header cells and yellow (close match) and orange (other)
+# hightlighted cells so that every styled cell shares one style
+header_style = NamedStyle(name="header", font=Font(bold=True))
+close_match_style = NamedStyle(
+    name="close_match",
+    fill=PatternFill(start_color="FFFF00", end_color="FFFF00", fill_type="solid"),
+)
+other_value_style = NamedStyle(
+    name="other_value",
+    fill=PatternFill(start_color="FF991C", end_color="FF991C", fill_type="solid"),
+)
+
 
 def log_it(message):
     print(message)
@@ -48,8 +65,7 @@ def log_it(message):
 
 def update_sheet_name(sheet_name):
     # Check if sheet name ends with a number
-    pattern = r"_\d+$"
-    m = re.search(pattern, sheet_name)
+    m = _SHEET_NUM_RE.search(sheet_name)
     if m:
         num = m.group().replace("_", "")
         char_len = len(num)
@@ -58,51 +74,49 @@ def update_sheet_name(sheet_name):
         return sheet_name + "_1"
 
 
-def get_close_matches(value, possibilities, n=3, cutoff=0.5):
-    matches = []
+def get_close_matches(value, possibilities, n=3, cutoff=0.5, matcher=None):
+    # Ignore case
+    value_lower = value.lower()
 
-    # Check if attribute value is a substring of code/description
+    # Check if attribute value is a substring of code/description, or if
+    # code/description is a substring of value - no need to use difflib
     for p in possibilities:
-        # Ignore case
-        m = re.search(value, p, re.IGNORECASE)
-        if m:
-            matches.append(value)
-            break
-
-    # Check if any words in value match code/description
+        p_lower = p.lower()
+        if value_lower in p_lower or p_lower in value_lower:
+            return [value]
+
+    # Use difflib - the matcher caches details about value (seq2), so it can be
+    # reused by the caller for every code/description compared with value
+    if matcher is None:
+        matcher = difflib.SequenceMatcher(None, autojunk=False)
+        matcher.set_seq2(value)
+    result = []
     for p in possibilities:
-        # Ignore case
-        m = re.search(p, value, re.IGNORECASE)
-        if m:
-            matches.append(value)
-            break
+        matcher.set_seq1(p)
+        # Cheap upper bounds first, only compute the full ratio if they pass
+        if matcher.real_quick_ratio() >= cutoff and matcher.quick_ratio() >= cutoff:
+            score = matcher.ratio()
+            if score >= cutoff:
+                result.append((score, p))
 
-    # Use difflib
-    matches.extend(difflib.get_close_matches(value, possibilities, n, cutoff))
-
-    return list(set(matches))
+    # Keep the n best matches, best first
+    return [p for score, p in heapq.nlargest(n, result)]
 
 
 def is_number(value):
     return isinstance(value, numbers.Number) and not isinstance(value, bool)
 
 
-def autofit_column_widths(ws):
-    for col in ws.columns:
-        max_length = 0
-        column = get_column_letter(
-            col[0].column
-        )  # Get column letter from the first cell in the column
-        for cell in col:
-            try:
-                if len(str(cell.value)) > max_length:
-                    max_length = len(str(cell.value))
-            except (
-                TypeError
-            ):  # Handle cases where cell.value might be None or not easily convertible to string
-                pass
+def autofit_column_widths(ws, sheet_rows):
+    # Get max length of each column from the staged cell values
+    col_widths = {}
+    for row_values in sheet_rows.values():
+        for col, value in row_values.items():
+            if len(str(value)) > col_widths.get(col, 0):
+                col_widths[col] = len(str(value))
+    for col, max_length in col_widths.items():
         adjusted_width = max_length + 2  # Add some padding
-        ws.column_dimensions[column].width = adjusted_width
+        ws.column_dimensions[get_column_letter(col)].width = adjusted_width
 
 
 # Tool inputs
@@ -117,36 +131,42 @@ out_xls = (
 
 # Set workspace environment
 arcpy.env.workspace = in_ws
-# Get list of feature datasets
-fds_list = arcpy.ListDatasets(feature_type="Feature")
-fds_list.append("")
+# Walk the workspace once to get feature classes/tables {dirpath: [names]}
+walk_dict = {}
+for dirpath, dirnames, filenames in arcpy.da.Walk(
+    in_ws, datatype=["FeatureClass", "Table"]
+):
+    walk_dict[dirpath] = filenames
+# Process feature datasets first, then stand-alone feature classes and tables
+dirpath_list = sorted(
+    walk_dict, key=lambda d: os.path.normpath(d) == os.path.normpath(in_ws)
+)
 # Create field domain dictionary {domain name: [fc:fld, fc:fld]}
 domain_fld_dict = {}
 # Create dictionary to store unqiue values associated with fc:field {'fc:field': [values]}
 attr_values_dict = {}
 # Loop through fcs in feature datasets to populate field domain dictionary
-for fds in fds_list:
-    fc_list = arcpy.ListFeatureClasses(feature_dataset=fds)
-    if fds == "":
-        # Get tables
-        fc_list.extend(arcpy.ListTables())
-    for fc in fc_list:
+for dirpath in dirpath_list:
+    for fc in walk_dict[dirpath]:
+        fc_path = os.path.join(dirpath, fc)
         # Get list of fields with domain assigned
-        fld_list = [fld for fld in arcpy.ListFields(fc) if fld.domain]
+        fld_list = [fld for fld in arcpy.ListFields(fc_path) if fld.domain]
         for fld in fld_list:
             if fld.domain not in domain_fld_dict.keys():
                 domain_fld_dict[fld.domain] = [f"{fc}:{fld.name}"]
             else:
                 domain_fld_dict[fld.domain].append(f"{fc}:{fld.name}")
 
-            # Get a list of unique values in field with domain
-            attr_values = []
-            with arcpy.da.SearchCursor(
-                fc, [fld.name], f"{fld.name} IS NOT NULL", sql_clause=("DISTINCT", None)
-            ) as cur:
+        # Get unique values in all fields with domains using one cursor
+        if fld_list:
+            value_sets = [set() for fld in fld_list]
+            with arcpy.da.SearchCursor(fc_path, [fld.name for fld in fld_list]) as cur:
                 for row in cur:
-                    attr_values.append(row[0])
-            attr_values_dict[f"{fc}:{fld.name}"] = attr_values
+                    for i, val in enumerate(row):
+                        if val is not None:
+                            value_sets[i].add(val)
+            for fld, values in zip(fld_list, value_sets):
+                attr_values_dict[f"{fc}:{fld.name}"] = list(values)
 
 
 # Get a list of coded value domains in workspace
@@ -163,8 +183,9 @@ report_dict = (
 for domain in domain_list:
     # Get coded values
     coded_values = domain.codedValues
-    # Get list of domain codes
+    # Get list and set of domain codes
     codes_list = list(coded_values.keys())
+    codes_set = set(codes_list)
     # Get list of domain descriptions
     desc_list = list(coded_values.values())
     # Initialize domain fields list
@@ -184,35 +205,42 @@ for domain in domain_list:
         # Loop through each fc:field and get list of unique attribute values
         for domain_fld in domain_fld_list:
             values_list = attr_values_dict[domain_fld]
-            # Create list for values used
-            used_list = []
+            # Create set for values used
+            used_set = set()
             # Check for values that match codes
             for val in values_list:
-                if val in codes_list and val not in used_list:
+                if val in codes_set and val not in used_set:
                     # Add value to code's dictionary
                     codes_dict[val]["matches"][domain_fld] = val
-                    # Append value to used list
-                    used_list.append(val)
+                    # Add value to used set
+                    used_set.add(val)
 
-            # Get list of unique values in fc:field that didn't match a domain code
-            non_match_list = list(set(values_list) - set(used_list))
-            used_list2 = []
+            # Get set of unique values in fc:field that didn't match a domain code
+            non_match_list = set(values_list) - used_set
+            used_set2 = set()
             for val in non_match_list:
                 # Only check for close matches if value is not a number or less than 3 char
                 if not is_number(val) and len(val) > 2:
+                    # Create one matcher per value to compare with all codes/descriptions
+                    matcher = difflib.SequenceMatcher(None, autojunk=False)
+                    matcher.set_seq2(val)
                     for code, desc in coded_values.items():
                         if domain_fld in codes_dict[code]["close"].keys():
                             # Get current close matches and add to it
                             close_matches = codes_dict[code]["close"][domain_fld]
-                            close_matches.extend(get_close_matches(val, [code, desc]))
+                            close_matches.extend(
+                                get_close_matches(val, [code, desc], matcher=matcher)
+                            )
                         else:
                             # Create list of close matches
-                            close_matches = get_close_matches(val, [code, desc])
+                            close_matches = get_close_matches(
+                                val, [code, desc], matcher=matcher
+                            )
                         # Close matches function could return actual code as a 'close match'
                         if code in close_matches:
                             close_matches.append(val)
                         # Remove any actual codes from close matches since these are an exact match
-                        close_matches = list(set(close_matches) - set(codes_list))
+                        close_matches = list(set(close_matches) - codes_set)
                         if desc in close_matches:
                             # If the value in the field matches the description of a domain,
                             # then remove all close matches other than description because this
@@ -220,13 +248,12 @@ for domain in domain_list:
                             close_matches = [desc]
                         # Remove any duplicate values from the list of close matches
                         codes_dict[code]["close"][domain_fld] = list(set(close_matches))
-                        for i in close_matches:
-                            # Append close matches to a list so that they are not re-evaluated
-                            # as 'other'
-                            used_list2.append(i)
+                        # Add close matches to a set so that they are not re-evaluated
+                        # as 'other'
+                        used_set2.update(close_matches)
 
             # Check for other values that are not matches and are not close matches
-            others_list = list(set(non_match_list) - set(used_list2))
+            others_list = list(non_match_list - used_set2)
             others_dict[domain_fld] = others_list
 
     # Add data to domain dictionary
@@ -239,9 +266,13 @@ for domain in domain_list:
 
 # Loop through domain dictionary and print info to Excel
 if report_dict:
-    # Create new workbook
-    wb = openpyxl.Workbook()
-    wb.remove(wb["Sheet"])
+    # Create new workbook (write-only mode streams rows to disk as they are appended)
+    wb = openpyxl.Workbook(write_only=True)
+
+    # Register header and hightlighted cell styles
+    wb.add_named_style(header_style)
+    wb.add_named_style(close_match_style)
+    wb.add_named_style(other_value_style)
 
     #  Loop through report dictionary and write data to excel file
     sheet_names = []
@@ -256,27 +287,20 @@ if report_dict:
         # Create sheet
         ws = wb.create_sheet(sheet_name)
         domain_fld_list = domain_details["fields"]
+        # Get column of each field {fc:fld: column}, add 3 to account for list
+        # index beginning at 0, and to skip the code and description columns
+        fld_col = {fld: i + 3 for i, fld in enumerate(domain_fld_list)}
+        # Write-only sheets are written top to bottom, so stage cell values
+        # {row: {column: value}} and highlight styles {(row, column): style name}
+        sheet_rows = {}
+        sheet_fills = {}
         # Add column headers
-        ws["A1"] = "Code"
-        ws["B1"] = "Description"
+        sheet_rows[1] = {1: "Code", 2: "Description"}
         col = 3
         for fld in domain_fld_list:
-            ws.cell(row=1, column=col, value=fld)
+            sheet_rows[1][col] = fld
             col += 1
 
-        # Bold first row
-        bold_font = openpyxl.styles.Font(bold=True)
-        for cell in ws[1]:
-            cell.font = bold_font
-
-        # Create yellow and orange fills for hightlighted cells
-        yellow_fill = PatternFill(
-            start_color="FFFF00", end_color="FFFF00", fill_type="solid"
-        )
-        orange_fill = PatternFill(
-            start_color="FF991C", end_color="FF991C", fill_type="solid"
-        )
-
         # Add coded value details
         codes_dict = domain_details["codes"]
         # Start adding data to row 2, after header cells
@@ -285,30 +309,25 @@ if report_dict:
             matches = code_details["matches"]
             # If the code does not have any matching values, just add code and desc
             if not matches:
-                ws[f"A{row}"] = code
-                ws[f"B{row}"] = code_details["desc"]
+                sheet_rows.setdefault(row, {}).update(
+                    {1: code, 2: code_details["desc"]}
+                )
             for fld, val in matches.items():
-                ws[f"A{row}"] = code
-                ws[f"B{row}"] = code_details["desc"]
-                # Get column by getting index position in list of fields
-                # then add 3 to account for list index beginning at 0, and
-                # to skip the code and description columns
-                col = domain_fld_list.index(fld) + 3
-                ws.cell(row=row, column=col, value=val)
+                col = fld_col[fld]
+                sheet_rows.setdefault(row, {}).update(
+                    {1: code, 2: code_details["desc"], col: val}
+                )
             close_matches = code_details["close"]
             close_start_row = row
             for fld, val_list in close_matches.items():
                 row = close_start_row
                 for val in val_list:
                     row += 1
-                    ws[f"A{row}"] = code
-                    ws[f"B{row}"] = code_details["desc"]
-                    # Get column by getting index position in list of fields
-                    # then add 3 to account for list index beginning at 0, and
-                    # to skip the code and description columns
-                    col = domain_fld_list.index(fld) + 3
-                    highlight_cell = ws.cell(row=row, column=col, value=val)
-                    highlight_cell.fill = yellow_fill
+                    col = fld_col[fld]
+                    sheet_rows.setdefault(row, {}).update(
+                        {1: code, 2: code_details["desc"], col: val}
+                    )
+                    sheet_fills[(row, col)] = close_match_style.name
 
             row += 1
 
@@ -317,14 +336,32 @@ if report_dict:
         others_start_row = row
         for fld, val_list in others_dict.items():
             row = others_start_row
-            col = domain_fld_list.index(fld) + 3
+            col = fld_col[fld]
             for val in val_list:
-                highlight_cell = ws.cell(row=row, column=col, value=val)
-                highlight_cell.fill = orange_fill
+                sheet_rows.setdefault(row, {})[col] = val
+                sheet_fills[(row, col)] = other_value_style.name
                 row += 1
 
-        # Apply autofit to all columns
-        autofit_column_widths(ws)
+        # Apply autofit to all columns (must be set before rows are written)
+        autofit_column_widths(ws, sheet_rows)
+
+        # Write staged rows, bolding the first row and highlighting fills
+        for row in range(1, max(sheet_rows) + 1):
+            row_values = sheet_rows.get(row, {})
+            row_cells = []
+            for col in range(1, max(row_values, default=0) + 1):
+                val = row_values.get(col)
+                if row == 1:
+                    cell = WriteOnlyCell(ws, value=val)
+                    cell.style = header_style.name
+                    row_cells.append(cell)
+                elif (row, col) in sheet_fills:
+                    cell = WriteOnlyCell(ws, value=val)
+                    cell.style = sheet_fills[(row, col)]
+                    row_cells.append(cell)
+                else:
+                    row_cells.append(val)
+            ws.append(row_cells)
 
     # Sort sheets alphabeically by name
     wb._sheets.sort(key=lambda ws: ws.title.lower())
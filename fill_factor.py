@@ -30,17 +30,19 @@ Updates:
 3/30/2026:      Improved script efficiency and decreased run-time
                 by converting datasets to pandas dataframes to
                 get record counts.
+10/15/2026:     Replaced pandas dataframes with a single search
+                cursor pass per dataset that counts filled
+                (non-null, non-blank) values in each field.
 
 """
 
 import arcpy
 import os
-import pandas as pd
+from functools import lru_cache
 import openpyxl
-from openpyxl.styles.numbers import FORMAT_PERCENTAGE, FORMAT_PERCENTAGE_00
-from openpyxl.utils import get_column_letter
-from openpyxl.styles import PatternFill, Font
+from openpyxl.cell import WriteOnlyCell
 from openpyxl.formatting.rule import ColorScaleRule
+from gdb_report_utils import incremental_width_tracker, log_it, make_styles
 
 ##import warnings
 
@@ -51,39 +53,35 @@ arcpy.env.overwriteOutput = 1
 ##warnings.filterwarnings("ignore", category=UserWarning, module="openpyxl")
 
 
-def log_it(message):
-    print(message)
-    arcpy.AddMessage(message)
+@lru_cache(maxsize=None)
+def _describe(path):
+    return arcpy.Describe(path)
 
 
-def autofit_column_widths(ws):
-    for col in ws.columns:
-        max_length = 0
-        column = get_column_letter(
-            col[0].column
-        )  # Get column letter from the first cell in the column
-        for cell in col:
-            try:
-                if len(str(cell.value)) > max_length:
-                    max_length = len(str(cell.value))
-            except (
-                TypeError
-            ):  # Handle cases where cell.value might be None or not easily convertible to string
-                pass
-        adjusted_width = max_length * 1.05  # Add some padding
-        ws.column_dimensions[column].width = adjusted_width
+@lru_cache(maxsize=None)
+def _list_fields(path):
+    return tuple(arcpy.ListFields(path))
 
 
 # Tool inputs
 in_ws = arcpy.GetParameterAsText(0)
 out_xls = arcpy.GetParameterAsText(1)
 
-# Set null integer value
-null_int_val = -9999
-
-# Create new workbook and define header
-wb = openpyxl.Workbook()
-wb.remove(wb.active)
+# Create new workbook (write-only mode streams rows to disk as they are appended)
+wb = openpyxl.Workbook(write_only=True)
+make_styles(wb, "header", "thousands", "pct")
+
+# Define header
+header = [
+    "Feature Dataset",
+    "Feature Class/Table",
+    "Field Name",
+    "Field Type",
+    "Field Length",
+    "Default Domain",
+    "Rows Filled",
+    "Fill Factor",
+]
 
 # Set workspace environment
 arcpy.env.workspace = in_ws
@@ -91,126 +89,112 @@ arcpy.env.workspace = in_ws
 # Initialize list to store data properties
 records = []
 
-# Loop through all feature classes/tables in gdb and in all feature datasets
-fds_list = arcpy.ListDatasets(feature_type="Feature")
-fds_list.sort()
-fds_list.append("")
-for fds in fds_list:
-    # Get feature classes/tables
-    if fds == "":
-        log_it(f"Processing stand-alone datasets")
+# Walk the workspace once to collect all feature classes/tables in gdb and in
+# all feature datasets [(fds, ds, ds path, tab name)]
+all_ds = []
+for dirpath, dirnames, filenames in arcpy.da.Walk(
+    in_ws, datatype=["FeatureClass", "Table"]
+):
+    if os.path.normpath(dirpath) == os.path.normpath(in_ws):
         fds = "<standalone>"
-        fc_list = [
-            fc for fc in arcpy.ListFeatureClasses() if not fc.lower().startswith("gdb_")
-        ]
-        fc_list.sort()
-        t_list = [t for t in arcpy.ListTables() if not t.lower().startswith("gdb_")]
-        t_list.sort()
-        ds_list = fc_list + t_list
     else:
-        log_it(f"Processing feature dataset: {fds}")
-        ds_list = [
-            fc
-            for fc in arcpy.ListFeatureClasses(feature_dataset=fds)
-            if not fc.lower().startswith("gdb_")
-        ]
-        ds_list.sort()
-
-    for ds in ds_list:
-        log_it(f"Processing dataset: {ds}")
-        # Create new worksheet
-        desc = arcpy.Describe(ds)
+        fds = os.path.basename(dirpath)
+    for ds in filenames:
+        if ds[:4].lower() == "gdb_":
+            continue
+        ds_path = os.path.join(dirpath, ds)
+        desc = _describe(ds_path)
         if desc.dataType == "FeatureClass":
             tab_name = f"FC_{ds}"
         else:
             tab_name = f"T_{ds}"
-        ws = wb.create_sheet(tab_name[:31])
-        # Define header
-        ws["A1"] = "Feature Dataset"
-        ws["B1"] = "Feature Class/Table"
-        ws["C1"] = "Field Name"
-        ws["D1"] = "Field Type"
-        ws["E1"] = "Field Length"
-        ws["F1"] = "Default Domain"
-        ws["G1"] = "Rows Filled"
-        ws["H1"] = "Fill Factor"
-
-        # Initialize start row
-        row = 2
-
-        # Convert dataset to pandas dataframe
-        flds_list = [fld for fld in arcpy.ListFields(ds) if not fld.required]
-        fld_names = [fld.name for fld in flds_list]
-        numpy_array = arcpy.da.FeatureClassToNumPyArray(
-            ds, fld_names, null_value=null_int_val
-        )
-        df = pd.DataFrame(numpy_array)
-
-        # Get record count
-        record_count = len(df)
-        # Get field info
-        for fld in flds_list:
-            if fld.type == "String":
-                fld_count = len(
-                    df[
-                        (df[fld.name] == str(null_int_val))
-                        | (df[fld.name].strip() == "")
-                    ]
-                )
-            else:
-                fld_count = len(df[df[fld.name] == null_int_val])
-            if record_count > 0:
-                perc = float(fld_count / record_count)
-            else:
-                perc = 0
-
-            # Populate current worksheet
-            ws.cell(row=row, column=1, value=fds)
-            ws.cell(row=row, column=2, value=ds)
-            ws.cell(row=row, column=3, value=fld.name)
-            ws.cell(row=row, column=4, value=fld.type)
-            ws.cell(row=row, column=5, value=fld.length)
-            ws.cell(row=row, column=6, value=fld.domain)
-            ws.cell(row=row, column=7, value=fld_count)
-            ws.cell(row=row, column=8, value=perc)
-
-            # Update row
-            row += 1
-
-        # Bold and freeze first row
-        bold_font = openpyxl.styles.Font(bold=True)
-        for cell in ws[1]:
-            cell.font = bold_font
-        ws.freeze_panes = "A2"
-
-        # Update formatting for rows filled column
-        for cell in ws["G"]:
-            cell.number_format = "#,##0"
-
-        # Apply autofit to all columns
-        autofit_column_widths(ws)
-
-        # Format percentage row
-        for cell in ws["H"]:
-            if isinstance(cell.value, (int, float)):  # Only format numeric cells
-                cell.number_format = FORMAT_PERCENTAGE_00
-
-        # Conditional formatting on the percentage field
-        rule = ColorScaleRule(
-            start_type="percentile",
-            start_value=10,
-            start_color="f8696b",
-            mid_type="percentile",
-            mid_value=50,
-            mid_color="FFEF9C",
-            end_type="percentile",
-            end_value=90,
-            end_color="63BE7B",
+        all_ds.append((fds, ds, ds_path, tab_name[:31]))
+
+# Sort datasets by tab name so sheets are created in alphabetical order
+all_ds.sort(key=lambda x: x[3])
+
+for fds, ds, ds_path, tab_name in all_ds:
+    log_it(f"Processing dataset: {ds}")
+    # Create new worksheet
+    ws = wb.create_sheet(tab_name)
+
+    # Count filled values in each field with one pass through the dataset
+    flds_list = [fld for fld in _list_fields(ds_path) if not fld.required]
+    fld_names = [fld.name for fld in flds_list]
+    counts = [0] * len(fld_names)
+    record_count = 0
+    # Only string fields can hold empty strings, so other fields just check nulls
+    str_idx = [i for i, fld in enumerate(flds_list) if fld.type == "String"]
+    other_idx = [i for i, fld in enumerate(flds_list) if fld.type != "String"]
+    if fld_names:
+        with arcpy.da.SearchCursor(ds_path, fld_names) as cur:
+            for cur_row in cur:
+                record_count += 1
+                # Null values and empty strings are not filled
+                for i in str_idx:
+                    val = cur_row[i]
+                    if val is not None and val.strip() != "":
+                        counts[i] += 1
+                for i in other_idx:
+                    if cur_row[i] is not None:
+                        counts[i] += 1
+
+    # Get field info
+    update_widths, set_widths = incremental_width_tracker(len(header))
+    update_widths(header)
+    rows = []
+    for fld, fld_count in zip(flds_list, counts):
+        if record_count > 0:
+            perc = float(fld_count / record_count)
+        else:
+            perc = 0
+        rows.append(
+            (
+                fds,
+                ds,
+                fld.name,
+                fld.type,
+                fld.length,
+                fld.domain,
+                fld_count,
+                perc,
+            )
         )
-        ws.conditional_formatting.add(f"H2:H{row}", rule)
-
-# Sort sheets alphabetically
-wb._sheets.sort(key=lambda ws: ws.title)
+        update_widths(rows[-1])
+
+    # Apply autofit to all columns and freeze first row (must be set before rows are written)
+    set_widths(ws, padding=0, scale=1.05)
+    ws.freeze_panes = "A2"
+
+    # Write bold header row
+    header_cells = []
+    for h in header:
+        cell = WriteOnlyCell(ws, value=h)
+        cell.style = "header"
+        header_cells.append(cell)
+    ws.append(header_cells)
+
+    # Write field info, formatting rows filled and percentage columns
+    for row_values in rows:
+        count_cell = WriteOnlyCell(ws, value=row_values[6])
+        count_cell.style = "thousands"
+        perc_cell = WriteOnlyCell(ws, value=row_values[7])
+        perc_cell.style = "pct"
+        ws.append(list(row_values[:6]) + [count_cell, perc_cell])
+
+    # Conditional formatting on the percentage field
+    rule = ColorScaleRule(
+        start_type="percentile",
+        start_value=10,
+        start_color="f8696b",
+        mid_type="percentile",
+        mid_value=50,
+        mid_color="FFEF9C",
+        end_type="percentile",
+        end_value=90,
+        end_color="63BE7B",
+    )
+    ws.conditional_formatting.add(f"H2:H{len(rows) + 2}", rule)
 
 # Save excel
 wb.save(out_xls)
@@ -0,0 +1,87 @@
+"""
+Script Name: gdb_report_utils.py
+Date: Oct. 15, 2026
+
+Description:
+    Helpers shared by the geodatabase Excel report scripts
+    (fill_factor.py, record_count.py, report_domain_errors.py, and
+    schema_compare.py) for logging, column widths, and named cell styles.
+
+Notes:
+    - Column widths are tracked as rows are built so they can be set
+      before rows are written to write-only worksheets.
+
+Versions:
+    - ArcGIS Pro 3.5.2
+    - Python 3.11.11
+
+Copyright (c) 2026 Esri. All rights reserved.
+
+Updates:
+
+"""
+
+import arcpy
+from openpyxl.utils import get_column_letter
+from openpyxl.styles import Alignment, Font, NamedStyle
+from openpyxl.styles.numbers import FORMAT_PERCENTAGE_00
+
+# Properties of the named styles used in the reports {style name: properties}
+STYLE_PROPERTIES = {
+    "header": {"font": Font(bold=True)},
+    "thousands": {"number_format": "#,##0"},
+    "pct": {"number_format": FORMAT_PERCENTAGE_00},
+    "code": {"alignment": Alignment(horizontal="center", vertical="center")},
+    "count": {
+        "number_format": "#,##0",
+        "alignment": Alignment(horizontal="center", vertical="center"),
+    },
+    "count_header": {
+        "font": Font(bold=True),
+        "number_format": "#,##0",
+        "alignment": Alignment(horizontal="center", vertical="center"),
+    },
+    "field": {"alignment": Alignment(vertical="center")},
+    "valid_values": {"alignment": Alignment(wrapText=True, vertical="center")},
+}
+
+
+def log_it(message, level=0):
+    print(message)
+    if level == 0:
+        arcpy.AddMessage(message)
+    elif level == 1:
+        arcpy.AddWarning(message)
+    else:
+        arcpy.AddError(message)
+
+
+def incremental_width_tracker(n_cols):
+    # Track max length of each column as rows are built
+    max_len = [0] * n_cols
+
+    def update(row_values):
+        for i, value in enumerate(row_values):
+            if value is not None:
+                length = len(str(value))
+                if length > max_len[i]:
+                    max_len[i] = length
+
+    def finalize(ws, padding=2, scale=1, widths=None):
+        # Set column widths (must be set before rows are written in write-only
+        # mode), widths {column index: width} overrides the tracked width
+        widths = widths or {}
+        for i, length in enumerate(max_len):
+            width = widths.get(i, length * scale + padding)
+            ws.column_dimensions[get_column_letter(i + 1)].width = width
+
+    return update, finalize
+
+
+def make_styles(wb, *names):
+    # Create and register named styles with the workbook {style name: NamedStyle}
+    styles = {}
+    for name in names:
+        styles[name] = NamedStyle(name=name, **STYLE_PROPERTIES[name])
+        wb.add_named_style(styles[name])
+    return styles
@@ -48,47 +48,43 @@ Updates:
                 that was all-lower case.
 4/8/2026:       Added try/except to logic so script continues to process datasets
                 even if one fails.
+10/15/2026:     Replaced pandas dataframes with a single search cursor pass
+                per dataset that tallies records by subtype and asset type.
 
 """
 
 import arcpy
 import os
+from collections import Counter
 import openpyxl
-from openpyxl.utils import get_column_letter
-from openpyxl.styles import Alignment
-import pandas as pd
+from openpyxl.cell import WriteOnlyCell
 import traceback
+from gdb_report_utils import incremental_width_tracker, log_it, make_styles
 
 # Overwrite existing output
 arcpy.env.overwriteOutput = 1
 
 
-def log_it(message, level=0):
-    print(message)
-    if level == 0:
-        arcpy.AddMessage(message)
-    elif level == 1:
-        arcpy.AddWarning(message)
-    else:
-        arcpy.AddError(message)
-
-
-def autofit_column_widths(ws):
-    for col in ws.columns:
-        max_length = 0
-        column = get_column_letter(
-            col[0].column
-        )  # Get column letter from the first cell in the column
-        for cell in col:
-            try:
-                if len(str(cell.value)) > max_length:
-                    max_length = len(str(cell.value))
-            except (
-                TypeError
-            ):  # Handle cases where cell.value might be None or not easily convertible to string
-                pass
-        adjusted_width = max_length + 2  # Add some padding
-        ws.column_dimensions[column].width = adjusted_width
+def write_row(ws, row_values, style=None):
+    # Count columns (D, G, J) use a thousands separator and code
+    # columns (E, H) are centered
+    row_cells = []
+    for col, value in enumerate(row_values, 1):
+        if style:
+            cell_style = style
+        elif col in count_cols:
+            cell_style = "thousands"
+        elif col in code_cols:
+            cell_style = "code"
+        else:
+            cell_style = None
+        if value is None or not cell_style:
+            row_cells.append(value)
+            continue
+        cell = WriteOnlyCell(ws, value=value)
+        cell.style = cell_style
+        row_cells.append(cell)
+    ws.append(row_cells)
 
 
 # Tool inputs
@@ -96,24 +92,22 @@ in_ws = arcpy.GetParameterAsText(0)
 out_xls = arcpy.GetParameterAsText(1)
 include_assettypes = arcpy.GetParameter(2)
 
-# Set null integer value
-null_int_val = -9999
-
-# Create new workbook and define header
-wb = openpyxl.Workbook()
-ws = wb.active
-ws["A1"] = "Feature Dataset"
-ws["B1"] = "Feature Class/Table"
-ws["C1"] = "Shape Type"
-ws["D1"] = "Record Count"
-ws["E1"] = "Subtype Code"
-ws["F1"] = "Subtype Name"
-ws["G1"] = "Subtype Count"
+# Define header
+header = [
+    "Feature Dataset",
+    "Feature Class/Table",
+    "Shape Type",
+    "Record Count",
+    "Subtype Code",
+    "Subtype Name",
+    "Subtype Count",
+]
 if include_assettypes:
-    ws["H1"] = "Asset Type Code"
-    ws["I1"] = "Asset Type Name"
-    ws["J1"] = "Asset Type Count"
+    header.extend(["Asset Type Code", "Asset Type Name", "Asset Type Count"])
 
+# Define count and code column numbers
+count_cols = (4, 7, 10)
+code_cols = (5, 8)
 
 # Set workspace environment
 arcpy.env.workspace = in_ws
@@ -121,31 +115,56 @@ arcpy.env.workspace = in_ws
 # Initialize list to store data properties
 records = []
 
+# Walk the workspace once to group feature classes/tables by feature dataset
+# {fds: [dataset paths]}, stand-alone datasets are grouped under ""
+ds_dict = {}
+for dirpath, dirnames, filenames in arcpy.da.Walk(
+    in_ws, datatype=["FeatureClass", "Table"]
+):
+    if os.path.normpath(dirpath) == os.path.normpath(in_ws):
+        fds = ""
+    else:
+        fds = os.path.basename(dirpath)
+    ds_dict.setdefault(fds, []).extend(
+        os.path.join(dirpath, filename) for filename in filenames
+    )
+
 # Loop through all feature classes/tables in gdb and in all feature datasets
-fds_list = arcpy.ListDatasets(feature_type="Feature")
-fds_list.sort()
+fds_list = sorted(fds for fds in ds_dict if fds)
 fds_list.append("")
 for fds in fds_list:
+    # Describe each dataset once {dataset path: describe object}, datasets that
+    # can't be described are logged and skipped
+    desc_dict = {}
+    for path in ds_dict.get(fds, []):
+        try:
+            desc_dict[path] = arcpy.Describe(path)
+        except:
+            log_it(f"Processing dataset: {os.path.basename(path)}")
+            log_it(f"An error was encountered: {traceback.format_exc()}", 1)
     # Get feature classes/tables
     if fds == "":
         log_it(f"Processing stand-alone datasets")
         fds = "<standalone>"
-        fc_list = arcpy.ListFeatureClasses()
-        tbl_list = arcpy.ListTables()
-        fc_list.sort()
-        tbl_list.sort()
-        ds_list = fc_list + tbl_list
+        # Sort feature classes then tables alphabetically
+        ds_list = sorted(
+            desc_dict,
+            key=lambda path: (
+                desc_dict[path].dataType != "FeatureClass",
+                os.path.basename(path),
+            ),
+        )
     else:
         log_it(f"Processing feature dataset: {fds}")
-        ds_list = arcpy.ListFeatureClasses(feature_dataset=fds)
-        ds_list.sort()
+        ds_list = sorted(desc_dict, key=os.path.basename)
 
-    for ds in ds_list:
+    for path in ds_list:
+        ds = os.path.basename(path)
         try:
             log_it(f"Processing dataset: {ds}")
 
-            # Describe dataset to get properties
-            desc = arcpy.Describe(ds)
+            # Get describe properties
+            desc = desc_dict[path]
             # Get shape type
             try:
                 shape_type = desc.shapeType
@@ -155,46 +174,41 @@ for fds in fds_list:
 
             # Get subtype info
             subtype_fld = None
+            sorted_subtype_list = []
             if desc.subtypeFieldName:
                 subtype_fld = desc.subtypeFieldName
-                # Convert to pandas dataframe
-                flds_list = [
-                    fld.name
-                    for fld in arcpy.ListFields(ds)
-                    if fld.name.upper() in (subtype_fld.upper(), "ASSETTYPE")
-                ]
-            else:
-                flds_list = [
-                    fld.name
-                    for fld in arcpy.ListFields(ds)
-                    if fld.type
-                    in [
-                        "String",
-                        "OID",
-                        "Integer",
-                        "SmallInteger",
-                        "BigInteger",
-                        "Double",
+                # Get asset type field name (case-insensitive)
+                at_fld = None
+                if include_assettypes:
+                    at_flds = [
+                        fld.name
+                        for fld in arcpy.ListFields(path)
+                        if fld.name.upper() == "ASSETTYPE"
                     ]
-                ]
-            numpy_array = arcpy.da.FeatureClassToNumPyArray(
-                ds, flds_list, null_value=null_int_val
-            )
-            df = pd.DataFrame(numpy_array)
-            # Standardize column case to upper case
-            df.columns = df.columns.str.upper()
-
-            # Get record count
-            record_count = len(df)
-
-            subtype_list = []
-            sorted_subtype_list = []
-            if subtype_fld:
-                subtype_dict = arcpy.da.ListSubtypes(ds)
+                    if at_flds:
+                        at_fld = at_flds[0]
+
+                # Count records for each (subtype, asset type) combination in one pass
+                flds_list = [subtype_fld, at_fld] if at_fld else [subtype_fld]
+                with arcpy.da.SearchCursor(path, flds_list) as cur:
+                    tally = Counter(cur)
+                subtype_counts = Counter()
+                # Asset type counts of each subtype {subtype: {asset type: count}}
+                at_counts_by_subtype = {}
+                for key, count in tally.items():
+                    subtype_counts[key[0]] += count
+                    if at_fld:
+                        at_counts_by_subtype.setdefault(key[0], {})[key[1]] = count
+
+                # Get record count
+                record_count = sum(tally.values())
+
+                subtype_list = []
+                subtype_dict = arcpy.da.ListSubtypes(path)
                 for subtype_code, subtype_prop in subtype_dict.items():
                     subtype_name = subtype_prop["Name"]
                     # Get count of records for subtype
-                    subtype_count = len(df[df[subtype_fld.upper()] == subtype_code])
+                    subtype_count = subtype_counts[subtype_code]
                     if not include_assettypes:
                         subtype_list.append((subtype_code, subtype_name, subtype_count))
                     else:
@@ -203,29 +217,28 @@ for fds in fds_list:
                             key.upper(): value
                             for key, value in subtype_prop["FieldValues"].items()
                         }
-                        if "ASSETTYPE" in fld_val_dict.keys():
+                        if at_fld and "ASSETTYPE" in fld_val_dict:
                             domain = fld_val_dict["ASSETTYPE"][1]
                             if domain.domainType == "CodedValue":
-                                for at_code, at_name in domain.codedValues.items():
+                                # Read the coded values once (built on each access)
+                                coded_values = domain.codedValues
+                                at_counts = at_counts_by_subtype.get(subtype_code, {})
+                                for at_code, at_name in coded_values.items():
                                     # Get count of records for subtype
-                                    at_count = len(
-                                        df[
-                                            (df[subtype_fld.upper()] == subtype_code)
-                                            & (df["ASSETTYPE"] == at_code)
-                                        ]
-                                    )
+                                    at_count = at_counts.get(at_code, 0)
                                     assettype_list.append((at_code, at_name, at_count))
 
-                                # Get invalid asset types
-                                all_at = list(domain.codedValues.keys())
-                                invalid_df = df[
-                                    (df[subtype_fld.upper()] == subtype_code)
-                                    & (~df["ASSETTYPE"].isin(all_at))
-                                ]
-                                invalid_dict = (
-                                    invalid_df["ASSETTYPE"].value_counts().to_dict()
+                                # Get invalid asset types (most frequent first)
+                                invalid_at = Counter(
+                                    {
+                                        at_code: count
+                                        for at_code, count in at_counts.items()
+                                        if at_code not in coded_values
+                                    }
                                 )
-                                for at_code, at_count in invalid_dict.items():
+                                for at_code, at_count in invalid_at.most_common():
+                                    if at_code is None:
+                                        at_code = "Null"
                                     at_name = "<Invalid Value>"
                                     assettype_list.append((at_code, at_name, at_count))
                         subtype_list.append(
@@ -233,13 +246,12 @@ for fds in fds_list:
                         )
 
                 # Get record count of values that are not subtypes
-                all_subtypes = list(subtype_dict.keys())
-                invalid_df = df[~df[subtype_fld.upper()].isin(all_subtypes)]
-                invalid_dict = invalid_df[subtype_fld.upper()].value_counts().to_dict()
-                for subtype_code, subtype_count in invalid_dict.items():
+                for subtype_code, subtype_count in subtype_counts.most_common():
+                    if subtype_code in subtype_dict:
+                        continue
                     # Get subtype
                     subtype_name = "<Invalid Value>"
-                    if subtype_code == null_int_val:
+                    if subtype_code is None:
                         subtype_code = 99999999  # Need to make value number so results can be sorted on subtype code
                         subtype_name = "<Null>"
 
@@ -252,6 +264,9 @@ for fds in fds_list:
 
                 # Sort on subtype code
                 sorted_subtype_list = sorted(subtype_list, key=lambda x: x[0])
+            else:
+                # Get record count
+                record_count = int(arcpy.management.GetCount(path)[0])
 
             # Add details to data list
             val_tuple = (fds, ds, shape_type, record_count, sorted_subtype_list)
@@ -263,62 +278,48 @@ for fds in fds_list:
 
 # Write results to excel
 if records:
-    row = 2
+    # Build rows so that column widths can be set before rows are written
+    update_widths, set_widths = incremental_width_tracker(len(header))
+    update_widths(header)
+    rows = []
     for val in records:
         if val == "":
-            row += 1
+            rows.append([])
         else:
-            for i in range(0, len(val) - 1):
-                ws.cell(row=row, column=i + 1, value=val[i])
-            row += 1
+            rows.append(list(val[:-1]))
+            update_widths(rows[-1])
             if val[-1]:
                 for subtype in val[-1]:
                     if subtype[0] != 99999999:
-                        ws.cell(row=row, column=5, value=subtype[0])
+                        subtype_code = subtype[0]
                     else:
                         # Value 99999999 was used to sort by subtype code
                         # because the value had to be an int for sorting
                         # but want the code to actually show as Null
-                        ws.cell(row=row, column=5, value="Null")
-                    ws.cell(row=row, column=6, value=subtype[1])
-                    ws.cell(row=row, column=7, value=subtype[2])
-                    row += 1
+                        subtype_code = "Null"
+                    rows.append(
+                        [None, None, None, None, subtype_code, subtype[1], subtype[2]]
+                    )
+                    update_widths(rows[-1])
                     if include_assettypes:
                         assettype_list = subtype[3]
                         for at_values in assettype_list:
-                            ws.cell(row=row, column=8, value=at_values[0])
-                            ws.cell(row=row, column=9, value=at_values[1])
-                            ws.cell(row=row, column=10, value=at_values[2])
-                            row += 1
-
-    # Update formatting for record count columns
-    for cell in ws["D"]:
-        cell.number_format = "#,##0"
-
-    for cell in ws["G"]:
-        cell.number_format = "#,##0"
-
-    if include_assettypes:
-        for cell in ws["J"]:
-            cell.number_format = "#,##0"
-
-    # Center code fields
-    for row in ws.iter_rows(min_row=1, min_col=5, max_col=5):
-        for cell in row:
-            cell.alignment = Alignment(horizontal="center", vertical="center")
-
-    for row in ws.iter_rows(min_row=1, min_col=8, max_col=8):
-        for cell in row:
-            cell.alignment = Alignment(horizontal="center", vertical="center")
-
-    # Bold and freeze first row
-    bold_font = openpyxl.styles.Font(bold=True)
-    for cell in ws[1]:
-        cell.font = bold_font
+                            rows.append([None] * 7 + list(at_values))
+                            update_widths(rows[-1])
+
+    # Create new workbook (write-only mode streams rows to disk as they are appended)
+    wb = openpyxl.Workbook(write_only=True)
+    make_styles(wb, "header", "thousands", "code")
+    ws = wb.create_sheet("Sheet")
+
+    # Apply autofit to all columns and freeze first row (must be set before rows are written)
+    set_widths(ws)
     ws.freeze_panes = "A2"
 
-    # Apply autofit to all columns
-    autofit_column_widths(ws)
+    # Write bold header row, then the data rows
+    write_row(ws, header, "header")
+    for row_values in rows:
+        write_row(ws, row_values)
 
     # Save excel
     wb.save(out_xls)
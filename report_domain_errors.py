@@ -34,37 +34,45 @@ Updates:
 
 import arcpy
 import os
+from collections import Counter
+from dataclasses import dataclass
+from functools import lru_cache
 import openpyxl
-from openpyxl.utils import get_column_letter
-from openpyxl.styles import Alignment
+from openpyxl.cell import WriteOnlyCell
+from gdb_report_utils import incremental_width_tracker, log_it, make_styles
 
 # Overwrite existing output
 arcpy.env.overwriteOutput = 1
 
 
-def log_it(message):
-    print(message)
-    arcpy.AddMessage(message)
+@dataclass(slots=True)
+class Invalid:
+    value: object
+    count: int
 
 
-def autofit_column_widths(ws):
-    for col in ws.columns:
-        max_length = 0
-        column = get_column_letter(
-            col[0].column
-        )  # Get column letter from the first cell in the column
-        # Skip column C because it's word wrapped
-        if column != "C":
-            for cell in col:
-                try:
-                    if len(str(cell.value)) > max_length:
-                        max_length = len(str(cell.value))
-                except (
-                    TypeError
-                ):  # Handle cases where cell.value might be None or not easily convertible to string
-                    pass
-            adjusted_width = max_length + 2  # Add some padding
-            ws.column_dimensions[column].width = adjusted_width
+@dataclass(slots=True)
+class DomainField:
+    field: str
+    domain_type: str
+    valid_values: str
+    invalid: list
+
+
+@lru_cache(maxsize=None)
+def _list_fields(path):
+    return tuple(arcpy.ListFields(path))
+
+
+def write_row(ws, row_values, styles=()):
+    # Append row with its named styles
+    row_cells = list(row_values)
+    for i, style in enumerate(styles):
+        if style:
+            cell = WriteOnlyCell(ws, value=row_values[i])
+            cell.style = style
+            row_cells[i] = cell
+    ws.append(row_cells)
 
 
 # Tool inputs
@@ -97,9 +105,7 @@ for ds in ds_list:
 
 # Loop through each fc/table in dictionary
 log_it("Looping through each feature/class table")
-report_dict = (
-    {}
-)  # {ds name: {feature count: 0, domain fields: [{field: '', domain type: '', valid_values: '', invalid: [{invalid value: '', count: 0}]}]}
+report_dict = {}  # {ds name: {feature count: 0, domain fields: [DomainField]}}
 for fds, ds_list in ds_dict.items():
     if fds != "stand_alone":
         log_it(f"Processing feature classes from feature dataset: {fds}")
@@ -115,15 +121,22 @@ for fds, ds_list in ds_dict.items():
         log_it(ds)
         name = fds + "/" + ds
         name = name.replace("stand_alone/", "")
+        # Full path to the dataset is used as the list fields cache key
+        ds_path = os.path.join(arcpy.env.workspace, ds)
         # Get feature count
-        feat_count = arcpy.management.GetCount(ds).getOutput(0)
+        feat_count = int(arcpy.management.GetCount(ds)[0])
+        # Empty datasets can't have domain errors, skip field enumeration
+        if feat_count == 0:
+            continue
 
         # Get fields with domains
-        domain_flds = [fld for fld in arcpy.ListFields(ds) if fld.domain]
+        domain_flds = [fld for fld in _list_fields(ds_path) if fld.domain]
         # Loop through domain fields to get domain properties
         fld_list = []
         for fld in domain_flds:
             invalid_list = []
+            # Delimit field name once for all where clauses built for the field
+            fld_delim = arcpy.AddFieldDelimiters(ds, fld.name)
             domain_name = fld.domain
             # Look up domain in dictionary
             domain = domain_dict[domain_name]
@@ -133,154 +146,123 @@ for fds, ds_list in ds_dict.items():
             # Get domain values/ranges
             if domain_type == "CodedValue":
                 valid_values = tuple(domain.codedValues.keys())
-                where = f"{fld.name} NOT IN {valid_values}"
-                unique_list = []
-                with arcpy.da.SearchCursor(
-                    ds, [fld.name], where, sql_clause=("DISTINCT", None)
-                ) as cur:
-                    for row in cur:
-                        unique_list.append(row[0])
+                # Skip domains without codes (NOT IN () is not valid SQL)
+                if not valid_values:
+                    continue
+                # Quote string codes (escaping single quotes) for the IN list
+                if fld.type == "String":
+                    sql_values = ", ".join(
+                        "'{}'".format(str(val).replace("'", "''"))
+                        for val in valid_values
+                    )
+                else:
+                    sql_values = ", ".join(map(str, valid_values))
+                where = f"{fld_delim} NOT IN ({sql_values})"
+                # Get count of each invalid value in one pass
+                with arcpy.da.SearchCursor(ds, [fld.name], where) as cur:
+                    invalid_counts = Counter(row[0] for row in cur)
                 # Update valid values to string so it can be added to excel
                 valid_values = ",".join(map(str, valid_values))
                 # If there are no invalid values, continue
-                if not unique_list:
+                if not invalid_counts:
                     continue
                 else:
-                    # Get count of each invalid value
-                    for val in unique_list:
-                        # Handle string vs number
-                        if fld.type == "String":
-                            where = f"{fld.name} = '{val}'"
-                        else:
-                            where = f"{fld.name} = {val}"
-
-                        # Handle fc vs table
-                        if arcpy.Describe(ds).dataType == "FeatureClass":
-                            arcpy.management.MakeFeatureLayer(ds, "i", where)
-                        else:
-                            arcpy.management.MakeTableView(ds, "i", where)
-
-                        # Get count of invalid values
-                        count = arcpy.management.GetCount("i").getOutput(0)
-                        invalid_list.append({"value": val, "count": count})
+                    for val, count in invalid_counts.items():
+                        invalid_list.append(Invalid(val, count))
             else:
                 min_range = domain.range[0]
                 max_range = domain.range[1]
                 valid_values = f"{min_range} - {max_range}"
 
-                # Find where value is less than min range
-                where = f"{fld.name} < {min_range}"
-                # Handle fc vs table
-                if arcpy.Describe(ds).dataType == "FeatureClass":
-                    arcpy.management.MakeFeatureLayer(ds, "i", where)
-                else:
-                    arcpy.management.MakeTableView(ds, "i", where)
-
-                # Get count of invalid values
-                count = arcpy.management.GetCount("i").getOutput(0)
-                if int(count) > 0:
-                    invalid_list.append({"value": f"< {min_range}", "count": count})
-
-                # Find where value is greater than min range
-                where = f"{fld.name} > {max_range}"
-                # Handle fc vs table
-                if arcpy.Describe(ds).dataType == "FeatureClass":
-                    arcpy.management.MakeFeatureLayer(ds, "i", where)
-                else:
-                    arcpy.management.MakeTableView(ds, "i", where)
+                # Count values less than min range with a cursor (no layer/GetCount)
+                where = f"{fld_delim} < {min_range}"
+                with arcpy.da.SearchCursor(ds, ["OID@"], where) as cur:
+                    count = sum(1 for _ in cur)
+                if count > 0:
+                    invalid_list.append(Invalid(f"< {min_range}", count))
 
-                # Get count of invalid values
-                count = arcpy.management.GetCount("i").getOutput(0)
-                if int(count) > 0:
-                    invalid_list.append({"value": f"> {max_range}", "count": count})
+                # Count values greater than max range
+                where = f"{fld_delim} > {max_range}"
+                with arcpy.da.SearchCursor(ds, ["OID@"], where) as cur:
+                    count = sum(1 for _ in cur)
+                if count > 0:
+                    invalid_list.append(Invalid(f"> {max_range}", count))
 
             # Only add info if invalid values were found
             if invalid_list:
-                domain_info = {
-                    "field": fld.name,
-                    "domain_type": domain_type,
-                    "valid_values": valid_values,
-                    "invalid": invalid_list,
-                }
-                fld_list.append(domain_info)
+                fld_list.append(
+                    DomainField(fld.name, domain_type, valid_values, invalid_list)
+                )
 
         # Only add info if fields with invalid values were found
         if fld_list:
             # Sort fields alphabetically
-            sorted_fld_list = sorted(fld_list, key=lambda x: x["field"])
+            sorted_fld_list = sorted(fld_list, key=lambda x: x.field)
             report_dict[name] = {
                 "feature_count": feat_count,
                 "domain_fields": sorted_fld_list,
             }
 
 if report_dict:
-    # Create new workbook
-    wb = openpyxl.Workbook()
-    wb.remove(wb["Sheet"])
+    # Create new workbook (write-only mode streams rows to disk as they are appended)
+    wb = openpyxl.Workbook(write_only=True)
+    make_styles(wb, "header", "count_header", "count", "field", "valid_values")
 
     # Loop through report dictionary and write data to excel file
     for ds, values in report_dict.items():
         ws = wb.create_sheet(ds.split("/")[-1])
-        bold_font = openpyxl.styles.Font(bold=True)
-        ws["A1"] = ds
-        ws["A1"].font = bold_font
-        ws["A2"] = "Feature Count"
-        ws["A2"].font = bold_font
-        ws["B2"] = int(values["feature_count"])
-        ws["B2"].font = bold_font
-        ws["A4"] = "Field Name"
-        ws["A4"].font = bold_font
-        ws["B4"] = "Domain Type"
-        ws["B4"].font = bold_font
-        ws["C4"] = "Valid Values"
-        ws["C4"].font = bold_font
-        ws["D4"] = "Invalid Value"
-        ws["D4"].font = bold_font
-        ws["E4"] = "Count"
-        ws["E4"].font = bold_font
-
-        row = 5
+        # Build rows [(row values, row styles)] so that column widths can be
+        # set before rows are written
+        rows = [
+            ([ds], ["header"]),
+            (
+                ["Feature Count", values["feature_count"]],
+                ["header", "count_header"],
+            ),
+            ([], []),
+            (
+                ["Field Name", "Domain Type", "Valid Values", "Invalid Value", "Count"],
+                ["header"] * 4 + ["count_header"],
+            ),
+        ]
+        merge_ranges = []
         for domain_fld in values["domain_fields"]:
-            ws[f"A{row}"] = domain_fld["field"]
-            ws[f"B{row}"] = domain_fld["domain_type"]
-            ws[f"C{row}"] = domain_fld["valid_values"]
-            merge_start = row
-            row += 1
-            for val in domain_fld["invalid"]:
-                ws[f"D{row}"] = val["value"]
-                ws[f"E{row}"] = int(val["count"])
-                merge_end = row
-                row += 1
-
+            rows.append(
+                (
+                    [
+                        domain_fld.field,
+                        domain_fld.domain_type,
+                        domain_fld.valid_values,
+                    ],
+                    ["field", "field", "valid_values"],
+                )
+            )
+            merge_start = len(rows)
+            for val in domain_fld.invalid:
+                rows.append(
+                    (
+                        [None, None, None, val.value, val.count],
+                        [None, None, None, None, "count"],
+                    )
+                )
+            merge_end = len(rows)
             # Merge invalid values cells in columns A, B, and C
-            ws.merge_cells(f"A{merge_start}:A{merge_end}")
-            ws.merge_cells(f"B{merge_start}:B{merge_end}")
-            ws.merge_cells(f"C{merge_start}:C{merge_end}")
-
-        # Update formatting for record count columns
-        ws["B2"].number_format = "#,##0"
-        for cell in ws["E"]:
-            cell.number_format = "#,##0"
-
-        # Center count data in column E
-        for row in ws.iter_rows(min_row=1, min_col=5, max_col=5):
-            for cell in row:
-                cell.alignment = Alignment(horizontal="center", vertical="center")
-
-        # Set width for column C
-        ws.column_dimensions["C"].width = 40
-
-        # Word wrap column with valid vaues
-        for cell in ws["C"]:
-            cell.alignment = Alignment(wrapText=True, vertical="center")
-
-        # Center count data in columns A and B
-        for row in ws.iter_rows(min_row=5, min_col=1, max_col=2):
-            for cell in row:
-                cell.alignment = Alignment(vertical="center")
-
-        # Apply autofit to all columns
-        autofit_column_widths(ws)
+            for col in "ABC":
+                merge_ranges.append(f"{col}{merge_start}:{col}{merge_end}")
+
+        # Get max length of each column (A-E)
+        update_widths, set_widths = incremental_width_tracker(5)
+        for row_values, _ in rows:
+            update_widths(row_values)
+
+        # Apply autofit to all columns (must be set before rows are written),
+        # column C is set to a fixed width because it's word wrapped
+        set_widths(ws, widths={2: 40})
+
+        for row_values, styles in rows:
+            write_row(ws, row_values, styles)
+        for merge_range in merge_ranges:
+            ws.merged_cells.add(merge_range)
 
     # Save excel file
     wb.save(out_xls)
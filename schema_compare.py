@@ -47,16 +47,108 @@ Updates:
 12/12/2025:     Added item (feature class, table, domain, etc) to for missing/additional to
                 Base/Test column in output spreadsheet.
 3/19/2026:      Fixed logical error (typo) in condition for compare domains function.
+10/15/2026:     Stream xml files with iterparse (clearing each DataElement once read)
+                rather than parsing the whole tree into memory.
+10/15/2026:     Read all domains and dataset properties from each xml file in a single
+                pass, rather than one pass per compare function.
 
 """
 
+from collections import defaultdict
+from functools import lru_cache
 from lxml import etree
 import operator
 import os
 import openpyxl
-from openpyxl.styles import Alignment
+from openpyxl.cell import WriteOnlyCell
 
 import arcpy
+from gdb_report_utils import make_styles
+
+# Qualified name of the xsi:type attribute that holds the DataElement type
+XSI_NS = "http://www.w3.org/2001/XMLSchema-instance"
+XSI_TYPE = "{%s}type" % XSI_NS
+
+# Compiled XPath to get the Name elements of child DataElements of a given type
+_CHILD_NAMES_BY_TYPE = etree.XPath(
+    "DataElement[@xsi:type=$t]/Name",
+    namespaces={"xsi": XSI_NS},
+)
+
+# Tags of the properties compared for each type of schema element
+_DOMAIN_TAGS = frozenset({"DomainName", "FieldType", "MergePolicy", "SplitPolicy"})
+_DS_TAGS = frozenset(
+    {"Name", "Versioned", "CanVersion", "ConfigurationKeyword", "ShapeType"}
+)
+_SUBTYPE_TAGS = frozenset({"SubtypeName", "SubtypeCode"})
+_FIELD_TAGS = frozenset(
+    {
+        "Type",
+        "IsNullable",
+        "Length",
+        "Precision",
+        "Scale",
+        "Required",
+        "Editable",
+        "DefaultValue",
+    }
+)
+_RC_TAGS = frozenset(
+    {
+        "Name",
+        "Versioned",
+        "CanVersion",
+        "ConfigurationKeyword",
+        "HasOID",
+        "OIDFieldName",
+        "Fields",
+        "Cardinality",
+        "IsComposite",
+        "OriginClassNames",
+        "DestinationClassNames",
+        "KeyType",
+        "ClassKey",
+        "IsReflexive",
+        "OriginClassKeys",
+        "RelationshipRules",
+        "IsAttachmentRelationship",
+    }
+)
+_FDS_TAGS = frozenset(
+    {"DatasetType", "Name", "Versioned", "CanVersion", "Extent", "SpatialReference"}
+)
+_TOPO_TAGS = frozenset(
+    {"Name", "ClusterTolerance", "ZClusterTolerance", "MaxGeneratedErrorCount"}
+)
+_TOPO_CLASS_ID_TAGS = frozenset({"OriginClassID", "DestinationClassID"})
+_TOPO_SUBTYPE_TAGS = frozenset({"OriginSubtype", "DestinationSubtype"})
+_TOPO_LIST_KEYS = frozenset({"FeatureClassNames", "TopologyRules"})
+# Sort rules by origin class, rule type, destination class, then subtypes
+_TOPO_RULE_SORT_KEY = operator.itemgetter(
+    "OriginClassID",
+    "TopologyRuleType",
+    "DestinationClassID",
+    "OriginSubtype",
+    "DestinationSubtype",
+)
+_ATTR_RULE_TAGS = frozenset(
+    {
+        "Type",
+        "FieldName",
+        "SubtypeCode",
+        "Description",
+        "UserEditable",
+        "IsEnabled",
+        "ReferencesExternalService",
+        "ExcludeFromClientEvaluation",
+        "ScriptExpression",
+        "TriggeringEvents",
+    }
+)
+# Marks a property missing from one side of a compare (properties with empty
+# text are None), reported as _MISSING_LABEL
+_SENTINEL = object()
+_MISSING_LABEL = "<missing>"
 
 
 def log_it(message):
@@ -64,78 +156,157 @@ def log_it(message):
     arcpy.AddMessage(message)
 
 
+def _freeze(obj):
+    # Recursively convert dicts/lists into hashable tuples (signatures) so they
+    # can be compared with set membership. Each item's signature is built once
+    # per compare, dict key order doesn't affect the signature.
+    if isinstance(obj, dict):
+        return tuple(sorted((key, _freeze(val)) for key, val in obj.items()))
+    if isinstance(obj, list):
+        return tuple(_freeze(val) for val in obj)
+    return obj
+
+
+def clear_schema_caches():
+    # Clear the cached extract_all results (e.g. if an xml file changed)
+    extract_all.cache_clear()
+
+
 def swap_key_value(d):
-    d_swap = {}
-    for key, val in d.items():
-        d_swap[val] = key
-
-    return d_swap
-
-
-def get_domain_properties(tree):
-    for node in tree.iter("Domains"):
-        domain_list = []
-        for elem in node.iter("Domain"):
-            domain_dict = {}
-            cv_dict = {}
-            for domain_prop in list(elem.iter()):
-                if domain_prop.tag in [
-                    "DomainName",
-                    "FieldType",
-                    "MergePolicy",
-                    "SplitPolicy",
-                ]:
-                    domain_dict[domain_prop.tag] = domain_prop.text
-                elif domain_prop.tag == "CodedValues":
-                    coded_values = domain_prop.getchildren()
-                    for cv in coded_values:
-                        for cv_prop in cv.iter():
-                            if cv_prop.tag == "Name":
-                                name = cv_prop.text
-                            elif cv_prop.tag == "Code":
-                                cv_dict[name] = cv_prop.text
-                    sorted_cv_dict = dict(sorted(cv_dict.items()))
-                    domain_dict["CodedValues"] = sorted_cv_dict
-                elif domain_prop.tag == "MaxValue":
-                    max_value = domain_prop.text
-                elif domain_prop.tag == "MinValue":
-                    min_value = domain_prop.text
-                    domain_dict["Range"] = "{} - {}".format(min_value, max_value)
-            domain_list.append(domain_dict)
+    return {val: key for key, val in d.items()}
 
-    # Sort domain list alphabetically by domain name
-    domain_list.sort(key=operator.itemgetter("DomainName"))
 
-    return domain_list
+def _iter_elements(xml_file, tags):
+    # Yield elements with the given tags as the xml file is parsed, then clear
+    # them and prune the siblings already processed so the whole tree is never
+    # held in memory. DataElements nested in another DataElement (feature
+    # dataset children) are cleared along with the outer DataElement.
+    for _, elem in etree.iterparse(xml_file, events=("end",), tag=tags, huge_tree=True):
+        yield elem
+        if next(elem.iterancestors("DataElement"), None) is None:
+            elem.clear(keep_tail=True)
+            while elem.getprevious() is not None:
+                del elem.getparent()[0]
+
 
+@lru_cache(maxsize=None)
+def extract_all(
+    xml_file,
+    ignore_ds_alias,
+    ignore_fld_alias,
+    ignore_hasm,
+    ignore_hasz,
+    ignore_len_non_text,
+):
+    # Stream the xml file once and extract the properties of every schema
+    # element into lists by category {category: properties}
+    ext = {
+        "Domains": [],
+        "esri:DEFeatureClass": [],
+        "esri:DETable": [],
+        "esri:DERelationshipClass": [],
+        "esri:DEFeatureDataset": [],
+        "esri:DETopology": [],
+        "AttributeRules": {},
+        "FeatureClassIDs": {},
+    }
+    for elem in _iter_elements(xml_file, ("Domains", "DataElement")):
+        if elem.tag == "Domains":
+            ext["Domains"] = [
+                get_domain_properties(domain) for domain in elem.iter("Domain")
+            ]
+            continue
+        ds_type = elem.get(XSI_TYPE)
+        if ds_type in ("esri:DEFeatureClass", "esri:DETable"):
+            ext[ds_type].append(
+                get_dataset_properties(
+                    elem,
+                    ignore_ds_alias,
+                    ignore_fld_alias,
+                    ignore_hasm,
+                    ignore_hasz,
+                    ignore_len_non_text,
+                )
+            )
+            ext["AttributeRules"].update(get_attr_rules_properties(elem))
+            if ds_type == "esri:DEFeatureClass":
+                ext["FeatureClassIDs"].update(get_fc_ids(elem))
+        elif ds_type == "esri:DERelationshipClass":
+            ext[ds_type].append(get_rc_properties(elem))
+        elif ds_type == "esri:DEFeatureDataset":
+            fds_dict = get_fds_properties(elem)
+            if fds_dict.get("DatasetType") == "esriDTFeatureDataset":
+                ext[ds_type].append(fds_dict)
+        elif ds_type == "esri:DETopology":
+            ext[ds_type].append(get_topo_properties(elem))
 
-def compare_domains(tree_base, tree_test):
-    domain_list_base = get_domain_properties(tree_base)
-    domain_list_test = get_domain_properties(tree_test)
+    # Sort domain list alphabetically by domain name
+    ext["Domains"].sort(key=operator.itemgetter("DomainName"))
+    for ds_type in (
+        "esri:DEFeatureClass",
+        "esri:DETable",
+        "esri:DERelationshipClass",
+        "esri:DEFeatureDataset",
+        "esri:DETopology",
+    ):
+        ext[ds_type].sort(key=operator.itemgetter("Name"))
+    ext["AttributeRules"] = dict(sorted(ext["AttributeRules"].items()))
+
+    return ext
+
+
+def get_domain_properties(elem):
+    domain_dict = {}
+    cv_dict = {}
+    for domain_prop in elem:
+        if domain_prop.tag in _DOMAIN_TAGS:
+            domain_dict[domain_prop.tag] = domain_prop.text
+        elif domain_prop.tag == "CodedValues":
+            for cv in domain_prop:
+                for cv_prop in cv:
+                    if cv_prop.tag == "Name":
+                        name = cv_prop.text
+                    elif cv_prop.tag == "Code":
+                        cv_dict[name] = cv_prop.text
+            sorted_cv_dict = dict(sorted(cv_dict.items()))
+            domain_dict["CodedValues"] = sorted_cv_dict
+        elif domain_prop.tag == "MaxValue":
+            max_value = domain_prop.text
+        elif domain_prop.tag == "MinValue":
+            min_value = domain_prop.text
+            domain_dict["Range"] = "{} - {}".format(min_value, max_value)
+
+    return domain_dict
+
+
+def compare_domains(domain_list_base, domain_list_test):
     if domain_list_base == domain_list_test:
         return ([], {}, [])
     else:
-        # Find domains in base that aren't identical to test
-        domain_diff_test = [i for i in domain_list_test if i not in domain_list_base]
         # Find missing domains
-        domain_names_test = [i["DomainName"] for i in domain_list_test]
-        domain_names_base = [i["DomainName"] for i in domain_list_base]
+        domain_names_test = {i["DomainName"] for i in domain_list_test}
+        domain_names_base = {i["DomainName"] for i in domain_list_base}
         domain_miss = [
             i for i in domain_list_base if i["DomainName"] not in domain_names_test
         ]
         domain_add = [
             i for i in domain_list_test if i["DomainName"] not in domain_names_base
         ]
-        # Find mismatch domains
-        for domain in domain_add:
-            domain_diff_test.remove(domain)
+        # Find domains in test that aren't identical to base (mismatch domains)
+        base_sigs = {_freeze(i) for i in domain_list_base}
+        domain_diff_test = [
+            i
+            for i in domain_list_test
+            if i["DomainName"] in domain_names_base and _freeze(i) not in base_sigs
+        ]
         domain_diff = {}
+        # Index base domains by name {domain name: domain}, first domain wins for
+        # duplicate names
+        base_by_name = {d["DomainName"]: d for d in reversed(domain_list_base)}
         for domain in domain_diff_test:
             domain_name = domain["DomainName"]
             # Get domain out of base list
-            domain_base = [
-                d for d in domain_list_base if d["DomainName"] == domain_name
-            ][0]
+            domain_base = base_by_name[domain_name]
             for key, val in domain.items():
                 # Get mismatch in property values
                 if key != "CodedValues":
@@ -150,380 +321,269 @@ def compare_domains(tree_base, tree_test):
                 # Get mismatched coded values
                 else:
                     if val != domain_base[key]:
-                        base_diff = (
-                            dict(set(domain_base[key].items()) - set(val.items()))
-                            if bool(
-                                dict(set(domain_base[key].items()) - set(val.items()))
-                            )
-                            else ""
-                        )
-                        test_diff = (
-                            dict(set(val.items()) - set(domain_base[key].items()))
-                            if bool(
-                                dict(set(val.items()) - set(domain_base[key].items()))
-                            )
-                            else ""
-                        )
-                        if base_diff != "" and test_diff != "":
+                        # Coded values {name: code} only in base/test
+                        base_cv = domain_base[key].items() - val.items()
+                        test_cv = val.items() - domain_base[key].items()
+                        if base_cv and test_cv:
                             adj = "additional and missing"
-                            base_diff = swap_key_value(base_diff)
-                            test_diff = swap_key_value(test_diff)
-                        elif base_diff != "":
-                            base_diff = swap_key_value(base_diff)
+                        elif base_cv:
                             adj = "missing"
-                        elif test_diff != "":
-                            test_diff = swap_key_value(test_diff)
+                        else:
                             adj = "additional"
+                        base_diff = swap_key_value(dict(base_cv)) if base_cv else ""
+                        test_diff = swap_key_value(dict(test_cv)) if test_cv else ""
 
-                        if domain_name in domain_diff.keys():
-                            domain_diff[domain_name].append(
-                                (
-                                    "Domain has {} CodedValues".format(adj),
-                                    str(base_diff),
-                                    str(test_diff),
-                                )
+                        domain_diff.setdefault(domain_name, []).append(
+                            (
+                                "Domain has {} CodedValues".format(adj),
+                                str(base_diff),
+                                str(test_diff),
                             )
-                        else:
-                            domain_diff[domain_name] = [
-                                (
-                                    "Domain has {} CodedValues".format(adj),
-                                    str(base_diff),
-                                    str(test_diff),
-                                )
-                            ]
+                        )
         return (domain_miss, domain_diff, domain_add)
 
 
+def _parse_subtype(subtype_elem):
+    # SubtypeName and SubtypeCode are direct children of the Subtype
+    return {s.tag: s.text for s in subtype_elem if s.tag in _SUBTYPE_TAGS}
+
+
+def _parse_field(field_elem, ignore_fld_alias, ignore_len_non_text):
+    flds_dict = {}
+    for fld_prop in field_elem:
+        flds_dict["Domain"] = ""
+        if fld_prop.tag in _FIELD_TAGS:
+            flds_dict[fld_prop.tag] = fld_prop.text
+        elif fld_prop.tag == "Name":
+            flds_dict[fld_prop.tag] = fld_prop.text.lower()
+        elif fld_prop.tag == "AliasName" and not ignore_fld_alias:
+            flds_dict[fld_prop.tag] = fld_prop.text
+        elif fld_prop.tag == "Domain":
+            for domain_prop in fld_prop:
+                if domain_prop.tag == "DomainName":
+                    flds_dict["Domain"] = domain_prop.text
+    if ignore_len_non_text and flds_dict["Type"] != "esriFieldTypeString":
+        del flds_dict["Length"]
+
+    return flds_dict
+
+
 def get_dataset_properties(
-    tree,
-    ds_type,
+    elem,
     ignore_ds_alias,
     ignore_fld_alias,
     ignore_hasm,
     ignore_hasz,
+    ignore_len_non_text,
 ):
-    dataset_list = []
-    for elem in tree.iter("DataElement"):
-        if elem.attrib.values()[0] == ds_type:
-            dataset_dict = {"SubtypeFieldName": ""}
-            subtype_name_fld = ""
-            subtype_default_code = ""
-            ##dataset_dict["SubtypeFieldName"] = ""
-            flds_list = []
-            subtype_list = []
-            for ds_prop in list(elem.iter()):
-                flds_dict = {}
-                if (
-                    ds_prop.tag
-                    in [
-                        "Name",
-                        "Versioned",
-                        "CanVersion",
-                        "ConfigurationKeyword",
-                        "ShapeType",
-                    ]
-                    and ds_prop.getparent().tag == "DataElement"
-                ):
-                    dataset_dict[ds_prop.tag] = ds_prop.text
-                elif (
-                    ds_prop.tag == "AliasName"
-                    and not ignore_ds_alias
-                    and ds_prop.getparent().tag == "DataElement"
-                ):
-                    dataset_dict[ds_prop.tag] = ds_prop.text
-                elif (
-                    ds_prop.tag == "HasM"
-                    and not ignore_hasm
-                    and ds_prop.getparent().tag == "DataElement"
-                ):
-                    dataset_dict[ds_prop.tag] = ds_prop.text
-                elif (
-                    ds_prop.tag == "HasZ"
-                    and not ignore_hasz
-                    and ds_prop.getparent().tag == "DataElement"
-                ):
-                    dataset_dict[ds_prop.tag] = ds_prop.text
-                elif ds_prop.tag == "Subtype":
-                    subtype_dict = {}
-                    for s in ds_prop.iter():
-                        if s.tag in ["SubtypeName", "SubtypeCode"]:
-                            subtype_dict[s.tag] = s.text
-                    subtype_list.append(subtype_dict)
-                elif ds_prop.tag == "SubtypeFieldName":
-                    dataset_dict[ds_prop.tag] = ds_prop.text
-                    subtype_name_fld = ds_prop.text
-                elif ds_prop.tag == "DefaultSubtypeCode":
-                    subtype_default_code = ds_prop.text
-                    ##dataset_dict[ds_prop.tag] = ds_prop.text
-                elif ds_prop.tag == "Field":
-                    flds_data = ds_prop.getchildren()
-                    for fld_prop in flds_data:
-                        flds_dict["Domain"] = ""
-                        if fld_prop.tag in [
-                            "Type",
-                            "IsNullable",
-                            "Length",
-                            "Precision",
-                            "Scale",
-                            "Required",
-                            "Editable",
-                            "DefaultValue",
-                        ]:
-                            flds_dict[fld_prop.tag] = fld_prop.text
-                        elif fld_prop.tag == "Name":
-                            flds_dict[fld_prop.tag] = fld_prop.text.lower()
-                        elif fld_prop.tag == "AliasName" and not ignore_fld_alias:
-                            flds_dict[fld_prop.tag] = fld_prop.text
-                        elif fld_prop.tag == "Domain":
-                            domain_data = fld_prop.getchildren()
-                            for domain_prop in domain_data:
-                                if domain_prop.tag == "DomainName":
-                                    flds_dict["Domain"] = domain_prop.text
-                    if (
-                        flds_dict["Type"] != "esriFieldTypeString"
-                        and IGNORE_LEN_NON_TEXT_FIELDS == True
-                    ):
-                        flds_dict.__delitem__("Length")
-                    if flds_dict not in flds_list:
-                        flds_list.append(flds_dict)
-                    dataset_dict["Fields"] = flds_list
-            dataset_dict["Subtypes"] = subtype_list
-            dataset_dict["SubtypeInfo"] = {subtype_name_fld: subtype_default_code}
-            dataset_list.append(dataset_dict)
-            dataset_list.sort(key=operator.itemgetter("Name"))
-
-    return dataset_list
-
-
-def compare_datasets(
-    tree_base,
-    tree_test,
-    ds_type,
-    name,
-    ignore_ds_alias,
-    ignore_fld_alias,
-    ignore_hasm=True,
-    ignore_hasz=True,
-):
-    ds_list_base = get_dataset_properties(
-        tree_base,
-        ds_type,
-        ignore_ds_alias,
-        ignore_fld_alias,
-        ignore_hasm,
-        ignore_hasz,
-    )
-    ds_list_test = get_dataset_properties(
-        tree_test,
-        ds_type,
-        ignore_ds_alias,
-        ignore_fld_alias,
-        ignore_hasm,
-        ignore_hasz,
-    )
+    # Dataset properties that aren't ignored
+    ds_tags = _DS_TAGS | {
+        tag
+        for tag, ignore in (
+            ("AliasName", ignore_ds_alias),
+            ("HasM", ignore_hasm),
+            ("HasZ", ignore_hasz),
+        )
+        if not ignore
+    }
+
+    def set_ds_prop(ds_prop):
+        dataset_dict[ds_prop.tag] = ds_prop.text
+
+    def set_subtype_default_code(ds_prop):
+        nonlocal subtype_default_code
+        subtype_default_code = ds_prop.text
+
+    def add_subtype(ds_prop):
+        subtype_list.append(_parse_subtype(ds_prop))
+
+    def add_field(ds_prop):
+        flds_dict = _parse_field(ds_prop, ignore_fld_alias, ignore_len_non_text)
+        # Skip duplicate fields (e.g. index fields) by signature
+        fld_sig = _freeze(flds_dict)
+        if fld_sig not in flds_seen:
+            flds_seen.add(fld_sig)
+            flds_list.append(flds_dict)
+        dataset_dict["Fields"] = flds_list
+
+    # Handlers for elements found at any depth of the DataElement {tag: handler}
+    nested_handlers = {
+        "Subtype": add_subtype,
+        "SubtypeFieldName": set_ds_prop,
+        "DefaultSubtypeCode": set_subtype_default_code,
+        "Field": add_field,
+    }
+    # Handlers for direct children of the DataElement {tag: handler}
+    top_handlers = dict.fromkeys(ds_tags, set_ds_prop) | nested_handlers
+
+    def walk(parent, handlers):
+        # Visit each element once, handled elements aren't descended into
+        for child in parent:
+            handler = handlers.get(child.tag)
+            if handler:
+                handler(child)
+            else:
+                walk(child, nested_handlers)
+
+    dataset_dict = {"SubtypeFieldName": ""}
+    subtype_default_code = ""
+    flds_list = []
+    flds_seen = set()
+    subtype_list = []
+    walk(elem, top_handlers)
+    dataset_dict["Subtypes"] = subtype_list
+    dataset_dict["SubtypeInfo"] = {
+        dataset_dict["SubtypeFieldName"]: subtype_default_code
+    }
+
+    return dataset_dict
+
+
+def compare_datasets(ds_list_base, ds_list_test, name):
     if ds_list_base == ds_list_test:
         return ([], {}, [])
     else:
-        # Find datasets in base that aren't identical to test
-        ds_diff_test = [i for i in ds_list_test if i not in ds_list_base]
         # Find missing datasets
-        ds_names_test = [i["Name"] for i in ds_list_test]
-        ds_names_base = [i["Name"] for i in ds_list_base]
+        ds_names_test = {i["Name"] for i in ds_list_test}
+        ds_names_base = {i["Name"] for i in ds_list_base}
         ds_miss = [i for i in ds_list_base if i["Name"] not in ds_names_test]
         ds_add = [i for i in ds_list_test if i["Name"] not in ds_names_base]
-        # Find mismatch datasets
-        for ds in ds_add:
-            ds_diff_test.remove(ds)
+        # Find datasets in test that aren't identical to base (mismatch datasets)
+        base_sigs = {_freeze(i) for i in ds_list_base}
+        ds_diff_test = [
+            i
+            for i in ds_list_test
+            if i["Name"] in ds_names_base and _freeze(i) not in base_sigs
+        ]
         ds_diff = {}
+        # Index base items by name {name: item}, first item wins for duplicate names
+        base_by_name = {d["Name"]: d for d in reversed(ds_list_base)}
         for ds in ds_diff_test:
             ds_name = ds["Name"]
             # Get dataset out of base list
-            ds_base = [d for d in ds_list_base if d["Name"] == ds_name][0]
+            ds_base = base_by_name[ds_name]
             for key, val in ds.items():
                 ##log_it(val)
                 if key == "SubtypeInfo":
-                    subtype_info_base = ds_base["SubtypeInfo"]
-                    if list(subtype_info_base.keys())[0] == list(val.keys())[0]:
-                        if list(subtype_info_base.values())[0] != list(val.values())[0]:
-                            if ds_name in ds_diff.keys():
-                                ds_diff[ds_name].append(
-                                    (
-                                        "{} has mismatch DefaultSubtypeCode property".format(
-                                            name, key
-                                        ),
-                                        list(subtype_info_base.keys())[0],
-                                        list(val.keys())[0],
-                                    )
-                                )
-                            else:
-                                ds_diff[ds_name] = (
+                    # SubtypeInfo holds one {subtype field name: default code} item
+                    fld_base, code_base = next(iter(ds_base["SubtypeInfo"].items()))
+                    fld_test, code_test = next(iter(val.items()))
+                    if fld_base == fld_test:
+                        if code_base != code_test:
+                            ds_diff.setdefault(ds_name, []).append(
+                                (
                                     "{} has mismatch DefaultSubtypeCode property".format(
                                         name, key
                                     ),
-                                    list(subtype_info_base.keys())[0],
-                                    list(val.keys())[0],
+                                    fld_base,
+                                    fld_test,
                                 )
+                            )
                 elif key == "Subtypes":
                     st_base_list = ds_base["Subtypes"]
-                    st_names_test = [st["SubtypeName"] for st in val]
-                    st_names_base = [st["SubtypeName"] for st in st_base_list]
+                    st_names_test = {st["SubtypeName"] for st in val}
+                    st_names_base = {st["SubtypeName"] for st in st_base_list}
                     st_miss = [
                         i for i in st_base_list if i["SubtypeName"] not in st_names_test
                     ]
                     st_add = [i for i in val if i["SubtypeName"] not in st_names_base]
                     for st in st_add:
-                        val.remove(st)
-                        if ds_name in ds_diff.keys():
-                            ds_diff[ds_name].append(
-                                ("Additional subtype", "", st["SubtypeName"])
-                            )
-                        else:
-                            ds_diff[ds_name] = (
-                                "Additional subtype",
-                                "",
-                                st["SubtypeName"],
-                            )
+                        ds_diff.setdefault(ds_name, []).append(
+                            ("Additional subtype", "", st["SubtypeName"])
+                        )
 
                     for st in st_miss:
-                        if ds_name in ds_diff.keys():
-                            ds_diff[ds_name].append(
-                                ("Missing subtype", st["SubtypeName"], "")
-                            )
-                        else:
-                            ds_diff[ds_name] = [
-                                ("Missing subtype", st["SubtypeName"], "")
-                            ]
+                        ds_diff.setdefault(ds_name, []).append(
+                            ("Missing subtype", st["SubtypeName"], "")
+                        )
 
                 elif key == "Fields":
                     # Get base fields
                     flds_base_list = ds_base["Fields"]
-                    flds_names_test = [fld["Name"] for fld in val]
-                    flds_names_base = [fld["Name"] for fld in flds_base_list]
+                    # Index base fields by name {field name: [fields]}, a name can
+                    # be listed more than once with different properties
+                    fbn = {}
+                    for f in flds_base_list:
+                        fbn.setdefault(f["Name"], []).append(f)
+                    flds_names_test = {fld["Name"] for fld in val}
                     flds_miss = [
                         i for i in flds_base_list if i["Name"] not in flds_names_test
                     ]
-                    flds_add = [i for i in val if i["Name"] not in flds_names_base]
+                    flds_add = [i for i in val if i["Name"] not in fbn]
                     for fld in flds_add:
-                        val.remove(fld)
-                        if ds_name in ds_diff.keys():
-                            ds_diff[ds_name].append(
-                                ("Additional field", "", fld["Name"])
-                            )
-                        else:
-                            ds_diff[ds_name] = [("Additional field", "", fld["Name"])]
+                        ds_diff.setdefault(ds_name, []).append(
+                            ("Additional field", "", fld["Name"])
+                        )
 
                     for fld in flds_miss:
-                        if ds_name in ds_diff.keys():
-                            ds_diff[ds_name].append(("Missing field", fld["Name"], ""))
-                        else:
-                            ds_diff[ds_name] = [("Missing field", fld["Name"], "")]
+                        ds_diff.setdefault(ds_name, []).append(
+                            ("Missing field", fld["Name"], "")
+                        )
 
+                    # Compare fields found in both base and test
                     for fld_prop in val:
                         fld_name = fld_prop["Name"]
-                        for flds_base in flds_base_list:
-                            if flds_base["Name"] == fld_name:
-                                # Check if properties of fields are the same
-                                for base_key, base_val in flds_base.items():
-                                    ##log_it("{}: {}".format(base_key, base_val))
-                                    for test_key, test_val in fld_prop.items():
-                                        if base_key == test_key:
-                                            if base_val != test_val:
-                                                if ds_name in ds_diff.keys():
-                                                    ds_diff[ds_name].append(
-                                                        (
-                                                            "{} field has different values for {}".format(
-                                                                fld_name, base_key
-                                                            ),
-                                                            str(base_val),
-                                                            str(test_val),
-                                                        )
-                                                    )
-                                                else:
-                                                    ds_diff[ds_name] = [
-                                                        (
-                                                            "{} field has different values for {}".format(
-                                                                fld_name, base_key
-                                                            ),
-                                                            str(base_val),
-                                                            str(test_val),
-                                                        )
-                                                    ]
+                        for flds_base in fbn.get(fld_name, ()):
+                            # Check if properties found in both fields are the same
+                            # (in base property order)
+                            for fld_key in [k for k in flds_base if k in fld_prop]:
+                                if flds_base[fld_key] != fld_prop[fld_key]:
+                                    ds_diff.setdefault(ds_name, []).append(
+                                        (
+                                            "{} field has different values for {}".format(
+                                                fld_name, fld_key
+                                            ),
+                                            str(flds_base[fld_key]),
+                                            str(fld_prop[fld_key]),
+                                        )
+                                    )
                 else:
                     # Get mismatch in property values
                     if val != ds_base[key]:
-                        if ds_name in ds_diff.keys():
-                            ds_diff[ds_name].append(
-                                (
-                                    "{} has mismatch {} property".format(name, key),
-                                    ds_base[key],
-                                    val,
-                                )
+                        ds_diff.setdefault(ds_name, []).append(
+                            (
+                                "{} has mismatch {} property".format(name, key),
+                                ds_base[key],
+                                val,
                             )
-                        else:
-                            ds_diff[ds_name] = [
-                                (
-                                    "{} has mismatch {} property".format(name, key),
-                                    ds_base[key],
-                                    val,
-                                )
-                            ]
+                        )
 
         return (ds_miss, ds_diff, ds_add)
 
 
-def get_rc_properties(tree, ds_type):
-    rc_list = []
-    for elem in tree.iter("DataElement"):
-        if elem.attrib.values()[0] == ds_type:
-            rc_dict = {}
-            for rc_prop in list(elem.getchildren()):
-                if rc_prop.tag in [
-                    "Name",
-                    "Versioned",
-                    "CanVersion",
-                    "ConfigurationKeyword",
-                    "HasOID",
-                    "OIDFieldName",
-                    "Fields",
-                    "Cardinality",
-                    "IsComposite",
-                    "OriginClassNames",
-                    "DestinationClassNames",
-                    "KeyType",
-                    "ClassKey",
-                    "IsReflexive",
-                    "OriginClassKeys",
-                    "RelationshipRules",
-                    "IsAttachmentRelationship",
-                ]:
-                    rc_dict[rc_prop.tag] = rc_prop.text
-            rc_list.append(rc_dict)
-            rc_list.sort(key=operator.itemgetter("Name"))
-
-    return rc_list
-
-
-def compare_relationship_classes(tree_base, tree_test, ds_type, name):
-    rc_list_base = get_rc_properties(tree_base, ds_type)
-    rc_list_test = get_rc_properties(tree_test, ds_type)
+def get_rc_properties(elem):
+    rc_dict = {}
+    for rc_prop in elem:
+        if rc_prop.tag in _RC_TAGS:
+            rc_dict[rc_prop.tag] = rc_prop.text
+
+    return rc_dict
+
+
+def compare_relationship_classes(rc_list_base, rc_list_test, name):
     if rc_list_base == rc_list_test:
         return ([], {}, [])
     else:
-        # Find relationship classes in base that aren't identical to test
-        rc_diff_test = [i for i in rc_list_test if i not in rc_list_base]
         # Find missing relationship classes
-        rc_names_test = [i["Name"] for i in rc_list_test]
-        rc_names_base = [i["Name"] for i in rc_list_base]
+        rc_names_test = {i["Name"] for i in rc_list_test}
+        rc_names_base = {i["Name"] for i in rc_list_base}
         rc_miss = [i for i in rc_list_base if i["Name"] not in rc_names_test]
         rc_add = [i for i in rc_list_test if i["Name"] not in rc_names_base]
-        # Find mismatch relationship classes
-        for rc in rc_add:
-            rc_diff_test.remove(rc)
+        # Find relationship classes in test that aren't identical to base
+        # (mismatch relationship classes)
+        base_sigs = {_freeze(i) for i in rc_list_base}
+        rc_diff_test = [
+            i
+            for i in rc_list_test
+            if i["Name"] in rc_names_base and _freeze(i) not in base_sigs
+        ]
         rc_diff = {}
+        # Index base items by name {name: item}, first item wins for duplicate names
+        base_by_name = {r["Name"]: r for r in reversed(rc_list_base)}
         for rc in rc_diff_test:
             rc_name = rc["Name"]
             # Get relationship class out of base list
-            rc_base = [r for r in rc_list_base if r["Name"] == rc_name][0]
+            rc_base = base_by_name[rc_name]
             for key, val in rc.items():
                 # Get mismatch in property values
                 if val != rc_base[key]:
@@ -538,424 +598,311 @@ def compare_relationship_classes(tree_base, tree_test, ds_type, name):
     return (rc_miss, rc_diff, rc_add)
 
 
-def get_fds_properties(tree, ds_type):
-    fds_list = []
-    for elem in tree.iter("DataElement"):
-        if elem.attrib.values()[0] == ds_type:
-            fds_dict = {"Children": []}
-            for fds_prop in list(elem.iter()):
-                if "esriDTFeatureDataset" in [
-                    i.text for i in fds_prop.getchildren() if i.tag == "DatasetType"
-                ]:
-                    children = fds_prop.getchildren()
-                    for child in children:
-                        if child.tag in [
-                            "DatasetType",
-                            "Name",
-                            "Versioned",
-                            "CanVersion",
-                            "Extent",
-                            "SpatialReference",
-                        ]:
-                            fds_dict[child.tag] = child.text
-                        elif child.tag == "Children":
-                            grandchildren = child.getchildren()
-                            for grandchild in grandchildren:
-                                if (
-                                    grandchild.tag == "DataElement"
-                                    and grandchild.attrib.values()[0]
-                                    == "esri:DEFeatureClass"
-                                ):
-                                    greatgrandchildren = grandchild.getchildren()
-                                    for greatgrandchild in greatgrandchildren:
-                                        if greatgrandchild.tag == "Name":
-                                            fds_dict["Children"].append(
-                                                greatgrandchild.text
-                                            )
-                                    fds_dict["Children"].sort()
-                    fds_list.append(fds_dict)
-                    fds_list.sort(key=operator.itemgetter("Name"))
-
-    return fds_list
-
-
-def compare_fds(tree_base, tree_test, ds_type, name):
-    fds_list_base = get_fds_properties(tree_base, ds_type)
-    fds_list_test = get_fds_properties(tree_test, ds_type)
+def get_fds_properties(elem):
+    fds_dict = {"Children": []}
+    for child in elem:
+        if child.tag in _FDS_TAGS:
+            fds_dict[child.tag] = child.text
+        elif child.tag == "Children":
+            fds_dict["Children"].extend(
+                fc_name.text
+                for fc_name in _CHILD_NAMES_BY_TYPE(child, t="esri:DEFeatureClass")
+            )
+            fds_dict["Children"].sort()
+
+    return fds_dict
+
+
+def compare_fds(fds_list_base, fds_list_test, name):
     if fds_list_base == fds_list_test:
         return ([], {}, [])
     else:
-        # Find feature datasets in base that aren't identical to test
-        fds_diff_test = [i for i in fds_list_test if i not in fds_list_base]
         # Find missing feature datasets
-        fds_names_test = [i["Name"] for i in fds_list_test]
-        fds_names_base = [i["Name"] for i in fds_list_base]
+        fds_names_test = {i["Name"] for i in fds_list_test}
+        fds_names_base = {i["Name"] for i in fds_list_base}
         fds_miss = [i for i in fds_list_base if i["Name"] not in fds_names_test]
         fds_add = [i for i in fds_list_test if i["Name"] not in fds_names_base]
-        # Find mismatch feature datasets
-        for fds in fds_add:
-            fds_diff_test.remove(fds)
+        # Find feature datasets in test that aren't identical to base
+        # (mismatch feature datasets)
+        base_sigs = {_freeze(i) for i in fds_list_base}
+        fds_diff_test = [
+            i
+            for i in fds_list_test
+            if i["Name"] in fds_names_base and _freeze(i) not in base_sigs
+        ]
         fds_diff = {}
+        # Index base items by name {name: item}, first item wins for duplicate names
+        base_by_name = {f["Name"]: f for f in reversed(fds_list_base)}
         for fds in fds_diff_test:
             fds_name = fds["Name"]
             # Get feature datasets out of base list
-            fds_base = [f for f in fds_list_base if f["Name"] == fds_name][0]
+            fds_base = base_by_name[fds_name]
             for key, val in fds.items():
                 if key != "Children":
                     # Get mismatch in property values
                     if val != fds_base[key]:
-                        if fds_name not in fds_diff.keys():
-                            fds_diff[fds_name] = [
-                                (
-                                    "{} has mismatch {} property".format(name, key),
-                                    fds_base[key],
-                                    val,
-                                )
-                            ]
-                        else:
-                            fds_diff[fds_name].append(
-                                (
-                                    "{} has mismatch {} property".format(name, key),
-                                    fds_base[key],
-                                    val,
-                                )
+                        fds_diff.setdefault(fds_name, []).append(
+                            (
+                                "{} has mismatch {} property".format(name, key),
+                                fds_base[key],
+                                val,
                             )
+                        )
     return (fds_miss, fds_diff, fds_add)
 
 
-def get_topo_properties(tree, ds_type):
+def get_fc_ids(elem):
     # Get dictionary of feature class ids: names
     fc_dict = {}
-    for elem in tree.iter("DataElement"):
-        if elem.attrib.values()[0] == "esri:DEFeatureClass":
-            for prop in list(elem.getchildren()):
-                if prop.tag == "Name":
-                    name = prop.text
-                elif prop.tag == "DSID":
-                    fc_dict[prop.text] = name
-
-    # Get topo properties
-    topo_list = []
-    for elem in tree.iter("DataElement"):
-        if elem.attrib.values()[0] == ds_type:
-            topo_dict = {}
-            fc_list = []
-            rule_list = []
-            for topo_prop in list(elem.getchildren()):
-                if topo_prop.tag in [
-                    "Name",
-                    "ClusterTolerance",
-                    "ZClusterTolerance",
-                    "MaxGeneratedErrorCount",
-                ]:
-                    topo_dict[topo_prop.tag] = topo_prop.text
-                elif topo_prop.tag == "FeatureClassNames":
-                    for fc in topo_prop.iter():
-                        if fc.tag == "Name":
-                            fc_list.append(fc.text)
-                        fc_list.sort()
-                elif topo_prop.tag == "TopologyRules":
-                    for topo_rules in list(topo_prop.getchildren()):
-                        rule_dict = {}
-                        for topo_rule in list(topo_rules.getchildren()):
-                            if topo_rule.tag == "TopologyRuleType":
-                                rule_dict[topo_rule.tag] = topo_rule.text
-                            elif topo_rule.tag in [
-                                "OriginClassID",
-                                "DestinationClassID",
-                            ]:
-                                rule_dict[topo_rule.tag] = fc_dict[topo_rule.text]
-                            elif topo_rule.tag in [
-                                "OriginSubtype",
-                                "DestinationSubtype",
-                            ]:
-                                rule_dict[topo_rule.tag] = topo_rule.text
-                        rule_list.append(rule_dict)
-
-            topo_dict["FeatureClassNames"] = fc_list
-            topo_dict["TopologyRules"] = sorted(
-                rule_list,
-                key=lambda x: (
-                    x["OriginClassID"],
-                    x["TopologyRuleType"],
-                    x["DestinationClassID"],
-                    x["OriginSubtype"],
-                    x["DestinationSubtype"],
-                ),
-            )
-            topo_list.append(topo_dict)
-            topo_list.sort(key=operator.itemgetter("Name"))
-
-    return topo_list
+    for prop in elem:
+        if prop.tag == "Name":
+            name = prop.text
+        elif prop.tag == "DSID":
+            fc_dict[prop.text] = name
+
+    return fc_dict
+
+
+def get_topo_properties(elem):
+    # Topology rule class ids are resolved to feature class names by
+    # resolve_topo_rules once all feature classes have been read
+    topo_dict = {}
+    fc_list = []
+    rule_list = []
+    for topo_prop in elem:
+        if topo_prop.tag in _TOPO_TAGS:
+            topo_dict[topo_prop.tag] = topo_prop.text
+        elif topo_prop.tag == "FeatureClassNames":
+            fc_list.extend(fc.text for fc in topo_prop.iter("Name"))
+            fc_list.sort()
+        elif topo_prop.tag == "TopologyRules":
+            for topo_rules in topo_prop:
+                rule_dict = {}
+                for topo_rule in topo_rules:
+                    if topo_rule.tag == "TopologyRuleType":
+                        rule_dict[topo_rule.tag] = topo_rule.text
+                    elif topo_rule.tag in _TOPO_CLASS_ID_TAGS:
+                        rule_dict[topo_rule.tag] = topo_rule.text
+                    elif topo_rule.tag in _TOPO_SUBTYPE_TAGS:
+                        rule_dict[topo_rule.tag] = topo_rule.text
+                rule_list.append(rule_dict)
+
+    topo_dict["FeatureClassNames"] = fc_list
+    topo_dict["TopologyRules"] = rule_list
+
+    return topo_dict
+
+
+def resolve_topo_rules(topo_list, fc_dict):
+    # Get copies of the topologies with rule class ids replaced by feature class
+    # names {feature class id: name} and the rules sorted
+    resolved_list = []
+    for topo_dict in topo_list:
+        rule_list = [
+            {
+                key: fc_dict[val] if key in _TOPO_CLASS_ID_TAGS else val
+                for key, val in rule_dict.items()
+            }
+            for rule_dict in topo_dict["TopologyRules"]
+        ]
+        resolved_list.append(
+            {
+                **topo_dict,
+                "TopologyRules": sorted(rule_list, key=_TOPO_RULE_SORT_KEY),
+            }
+        )
 
+    return resolved_list
 
-def compare_topo(tree_base, tree_test, ds_type, name):
-    topo_list_base = get_topo_properties(tree_base, ds_type)
-    topo_list_test = get_topo_properties(tree_test, ds_type)
 
+def compare_topo(topo_list_base, topo_list_test, name):
     if topo_list_base == topo_list_test:
         return ([], {}, [])
     else:
-        # Find topo datasets in base that aren't identical to test
-        topo_diff_test = [i for i in topo_list_test if i not in topo_list_base]
         # Find missing topo datasets
-        topo_names_test = [i["Name"] for i in topo_list_test]
-        topo_names_base = [i["Name"] for i in topo_list_base]
+        topo_names_test = {i["Name"] for i in topo_list_test}
+        topo_names_base = {i["Name"] for i in topo_list_base}
         topo_miss = [i for i in topo_list_base if i["Name"] not in topo_names_test]
         topo_add = [i for i in topo_list_test if i["Name"] not in topo_names_base]
-        # Find mismatch topo datasets
-        for topo in topo_add:
-            topo_diff_test.remove(topo)
-        topo_diff = {}
+        # Find topo datasets in test that aren't identical to base
+        # (mismatch topo datasets)
+        base_sigs = {_freeze(i) for i in topo_list_base}
+        topo_diff_test = [
+            i
+            for i in topo_list_test
+            if i["Name"] in topo_names_base and _freeze(i) not in base_sigs
+        ]
+        topo_diff = defaultdict(list)
+        mismatch_prefix = "{} has mismatch ".format(name)
+        # Index base items by name {name: item}, first item wins for duplicate names
+        base_by_name = {t["Name"]: t for t in reversed(topo_list_base)}
         for topo in topo_diff_test:
             topo_name = topo["Name"]
             # Get topo datasets out of base list
-            topo_base = [t for t in topo_list_base if t["Name"] == topo_name][0]
+            topo_base = base_by_name[topo_name]
             for key, val in topo.items():
-                if key not in ["FeatureClassNames", "TopologyRules"]:
+                if key not in _TOPO_LIST_KEYS:
                     # Get mismatch in property values
-                    if val != topo_base[key]:
-                        if topo_name not in topo_diff.keys():
-                            topo_diff[topo_name] = [
-                                (
-                                    "{} has mismatch {} property".format(name, key),
-                                    topo_base[key],
-                                    val,
-                                )
-                            ]
-                        else:
+                    base_val = topo_base.get(key, _SENTINEL)
+                    if val != base_val:
+                        if base_val is _SENTINEL:
+                            base_val = _MISSING_LABEL
+                        topo_diff[topo_name].append(
+                            (mismatch_prefix + key + " property", base_val, val)
+                        )
+                elif key == "FeatureClassNames":
+                    # Feature class names are compared as sets
+                    base_fcs = set(topo_base[key])
+                    test_fcs = set(val)
+                    if base_fcs != test_fcs:
+                        miss_fcs = base_fcs - test_fcs
+                        add_fcs = test_fcs - base_fcs
+                        for fc in miss_fcs:
                             topo_diff[topo_name].append(
-                                (
-                                    "{} has mismatch {} property".format(name, key),
-                                    topo_base[key],
-                                    val,
-                                )
+                                ("Missing feature class in topology", fc, None)
+                            )
+                        for fc in add_fcs:
+                            topo_diff[topo_name].append(
+                                ("Additional feature class in topology", None, fc)
                             )
-                elif key == "FeatureClassNames":
-                    if val != topo_base[key]:
-                        miss_fcs = list(set(topo_base[key]) - set(val))
-                        add_fcs = list(set(val) - set(topo_base[key]))
-                        if len(miss_fcs) > 0:
-                            for fc in miss_fcs:
-                                if topo_name not in topo_diff.keys():
-                                    topo_diff[topo_name] = [
-                                        ("Missing feature class in topology", fc, None)
-                                    ]
-                                else:
-                                    topo_diff[topo_name].append(
-                                        ("Missing feature class in topology", fc, None)
-                                    )
-
-                        if len(add_fcs) > 0:
-                            for fc in add_fcs:
-                                if topo_name not in topo_diff.keys():
-                                    topo_diff[topo_name] = [
-                                        (
-                                            "Additional feature class in topology",
-                                            None,
-                                            fc,
-                                        )
-                                    ]
-                                else:
-                                    topo_diff[topo_name].append(
-                                        (
-                                            "Additional feature class in topology",
-                                            None,
-                                            fc,
-                                        )
-                                    )
                 elif key == "TopologyRules":
-                    if val != topo_base[key]:
-                        miss_rules = []
-                        add_rules = []
-                        for rule in topo_base[key]:
-                            if rule not in val:
-                                miss_rules.append(rule)
-
-                        for rule in val:
-                            if rule not in topo_base[key]:
-                                add_rules.append(rule)
-
-                        if len(miss_rules) > 0:
-                            for rule in miss_rules:
-                                if topo_name not in topo_diff.keys():
-                                    topo_diff[topo_name] = [
-                                        (
-                                            "Missing topology rule",
-                                            str(rule).replace("'", ""),
-                                            None,
-                                        )
-                                    ]
-                                else:
-                                    topo_diff[topo_name].append(
-                                        (
-                                            "Missing topology rule",
-                                            str(rule).replace("'", ""),
-                                            None,
-                                        )
-                                    )
-                        if len(add_rules) > 0:
-                            for rule in add_rules:
-                                if topo_name not in topo_diff.keys():
-                                    topo_diff[topo_name] = [
-                                        (
-                                            "Additional topology rule",
-                                            None,
-                                            str(rule).replace("'", ""),
-                                        )
-                                    ]
-                                else:
-                                    topo_diff[topo_name].append(
-                                        (
-                                            "Additional topology rule",
-                                            None,
-                                            str(rule).replace("'", ""),
-                                        )
-                                    )
+                    # Rules are compared as sets of signatures
+                    base_rule_sigs = {_freeze(rule) for rule in topo_base[key]}
+                    test_rule_sigs = {_freeze(rule) for rule in val}
+                    if base_rule_sigs != test_rule_sigs:
+                        # Keep the sorted rule order and get the report string of
+                        # each unmatched rule
+                        miss_rules = [
+                            str(rule).replace("'", "")
+                            for rule in topo_base[key]
+                            if _freeze(rule) not in test_rule_sigs
+                        ]
+                        add_rules = [
+                            str(rule).replace("'", "")
+                            for rule in val
+                            if _freeze(rule) not in base_rule_sigs
+                        ]
+
+                        for rule_str in miss_rules:
+                            topo_diff[topo_name].append(
+                                ("Missing topology rule", rule_str, None)
+                            )
+                        for rule_str in add_rules:
+                            topo_diff[topo_name].append(
+                                ("Additional topology rule", None, rule_str)
+                            )
 
-    return (topo_miss, topo_diff, topo_add)
+    return (topo_miss, dict(topo_diff), topo_add)
 
 
-def get_attr_rules_properties(tree, ds_type):
+def get_attr_rules_properties(elem):
     # Get dictionary of attribute rule names
     attr_rules_dict = {}
-
-    for elem in tree.iter("DataElement"):
-        if elem.attrib.values()[0] in ds_type:
-            for prop in list(elem.getchildren()):
-                if prop.tag == "Name":
-                    ds_name = prop.text
-                if prop.tag == "AttributeRules":
-                    for a in list(prop.getchildren()):
-                        if a.tag == "AttributeRule":
-                            r_dict = {}
-                            r_dict["DatasetName"] = ds_name
-                            for i in list(a.getchildren()):
-                                if i.tag == "Name":
-                                    key = f"{ds_name}: {i.text}"
-                                elif i.tag in [
-                                    "Type",
-                                    "FieldName",
-                                    "SubtypeCode",
-                                    "Description",
-                                    "UserEditable",
-                                    "IsEnabled",
-                                    "ReferencesExternalService",
-                                    "ExcludeFromClientEvaluation",
-                                    "ScriptExpression",
-                                    "TriggeringEvents",
-                                ]:
-                                    r_dict[i.tag] = i.text
-                            sorted_dict = dict(sorted(r_dict.items()))
-                        attr_rules_dict[key] = sorted_dict
-
-    keys_sorted = sorted(attr_rules_dict.keys())
-    attr_rules_dict_sorted = {key: attr_rules_dict[key] for key in keys_sorted}
-    return attr_rules_dict_sorted
-
-
-def compare_attr_rules(tree_base, tree_test, ds_type, name):
-    attr_rules_list_base = get_attr_rules_properties(tree_base, ds_type)
-    attr_rules_list_test = get_attr_rules_properties(tree_test, ds_type)
-
+    for prop in elem:
+        if prop.tag == "Name":
+            ds_name = prop.text
+        elif prop.tag == "AttributeRules":
+            for a in prop:
+                if a.tag == "AttributeRule":
+                    r_dict = {}
+                    r_dict["DatasetName"] = ds_name
+                    for i in a:
+                        if i.tag == "Name":
+                            key = f"{ds_name}: {i.text}"
+                        elif i.tag in _ATTR_RULE_TAGS:
+                            r_dict[i.tag] = i.text
+                    attr_rules_dict[key] = dict(sorted(r_dict.items()))
+
+    return attr_rules_dict
+
+
+def compare_attr_rules(attr_rules_list_base, attr_rules_list_test, name):
     if attr_rules_list_base == attr_rules_list_test:
         return ([], {}, [])
     else:
-        # Check for keys (attribute rule name/fc) missing in base
-        base_keys = list(attr_rules_list_base.keys())
-        base_keys.sort()
-        test_keys = list(attr_rules_list_test.keys())
-        test_keys.sort()
-
-        if base_keys != test_keys:
-            # Check for attribute rules missing and additional
-            attr_miss = list(set(base_keys) - set(test_keys))
-            attr_add = list(set(test_keys) - set(base_keys))
-
-        # Check for differences in attribute rules
-        attr_diff = {}
-        attr_diff_items = [i for i in base_keys if i in test_keys]
+        # Check for keys (attribute rule name/fc) missing and additional
+        # (sorted, as set differences have no stable order)
+        attr_miss = sorted(attr_rules_list_base.keys() - attr_rules_list_test.keys())
+        attr_add = sorted(attr_rules_list_test.keys() - attr_rules_list_base.keys())
+
+        # Check for differences in attribute rules, the rules are already sorted by
+        # key when extracted
+        attr_diff = defaultdict(list)
+        attr_diff_items = [i for i in attr_rules_list_base if i in attr_rules_list_test]
         for i in attr_diff_items:
             prop_base = attr_rules_list_base[i]
             prop_test = attr_rules_list_test[i]
 
             if prop_base != prop_test:
+                domain_name_list = i.split(":")
+                domain_name = "".join(domain_name_list[1:]).strip()
+                mismatch_prefix = "{} has mismatch ".format(domain_name)
+                prop_test_get = prop_test.get
                 for key, val in prop_base.items():
-                    if val != prop_test[key]:
-                        if i not in attr_diff.keys():
-                            domain_name_list = i.split(":")
-                            domain_name = "".join(domain_name_list[1:]).strip()
-                            attr_diff[i] = [
-                                (
-                                    "{} has mismatch {} property".format(
-                                        domain_name, key
-                                    ),
-                                    prop_base[key],
-                                    prop_test[key],
-                                )
-                            ]
-                        else:
-                            attr_diff[i].append(
-                                (
-                                    "{} has mismatch {} property".format(
-                                        domain_name, key
-                                    ),
-                                    prop_base[key],
-                                    prop_test[key],
-                                )
-                            )
-    return (attr_miss, attr_diff, attr_add)
+                    test_val = prop_test_get(key, _SENTINEL)
+                    if val != test_val:
+                        if test_val is _SENTINEL:
+                            test_val = _MISSING_LABEL
+                        attr_diff[i].append(
+                            (mismatch_prefix + key + " property", val, test_val)
+                        )
+    return (attr_miss, dict(attr_diff), attr_add)
 
 
 def write_results_to_xls(
     wb, sheet_name, item_type, dict_key, miss_list, diff_dict, adds_list
 ):
-    # Write results to excel
+    # Write results to excel (write-only worksheet, rows are appended in order)
     ws = wb.create_sheet(sheet_name)
-    bold_font = openpyxl.styles.Font(bold=True)
-    for cell in ws["A1:D1"][0]:
-        cell.font = bold_font
-    ws["A1"] = "{} Name".format(item_type)
-    ws["B1"] = "Difference"
-    ws["C1"] = "Base"
-    ws["D1"] = "Test"
-
-    row = 2
+
+    def styled(value, style):
+        cell = WriteOnlyCell(ws, value=value)
+        cell.style = style
+        return cell
+
+    # Build the sheet's rows, then write them in one pass
+    rows = [
+        [
+            styled(header, "header")
+            for header in ("{} Name".format(item_type), "Difference", "Base", "Test")
+        ]
+    ]
+
+    miss_label = "Missing {}".format(item_type)
+    add_label = "Additional {}".format(item_type)
     for item in miss_list:
-        if dict_key:
-            ws.cell(row=row, column=1).value = item[dict_key]
-        else:
-            ws.cell(row=row, column=1).value = item
-        ws.cell(row=row, column=2).value = "Missing {}".format(item_type)
-        ws.cell(row=row, column=3).value = ws.cell(row=row, column=1).value
-        row += 1
+        item_name = item[dict_key] if dict_key else item
+        rows.append([item_name, miss_label, item_name])
 
     for key, val_list in diff_dict.items():
-        ws.cell(row=row, column=1).value = key
-        start_row = row
-        for val in val_list:
-            col = 2
-            for item in val:
-                ws.cell(row=row, column=col).value = item
-                col += 1
-            row += 1
-        # If more than one issue for an item, merge cells
-        if start_row + 1 < row:
-            ws.merge_cells(
-                start_row=start_row, start_column=1, end_row=row - 1, end_column=1
+        # If more than one issue for an item, merge cells and vertically align
+        # text in merged cell
+        if len(val_list) > 1:
+            start_row = len(rows) + 1
+            ws.merged_cells.add(
+                "A{}:A{}".format(start_row, start_row + len(val_list) - 1)
             )
-            # Vertically align text merged cell
-            merged_cell = ws.cell(row=start_row, column=1)
-            merged_cell.alignment = Alignment(vertical="center")
+            rows.append([styled(key, "field"), *val_list[0]])
+        else:
+            rows.append([key, *val_list[0]])
+        rows.extend([None, *val] for val in val_list[1:])
 
     for item in adds_list:
-        if dict_key:
-            ws.cell(row=row, column=1).value = item[dict_key]
-        else:
-            ws.cell(row=row, column=1).value = item
-        ws.cell(row=row, column=2).value = "Additional {}".format(item_type)
-        ws.cell(row=row, column=4).value = ws.cell(row=row, column=1).value
-        row += 1
+        item_name = item[dict_key] if dict_key else item
+        rows.append([item_name, add_label, None, item_name])
+
+    append = ws.append
+    for row in rows:
+        append(row)
+
+
+def run_compares(compare_jobs):
+    # Run the compare functions {category: (compare function, args)}
+    results = {}
+    for category, (compare_func, args) in compare_jobs.items():
+        log_it("Comparing {}".format(category.lower()))
+        results[category] = compare_func(*args)
+    return results
 
 
 # Configuration
@@ -984,14 +931,13 @@ ignore_dict = {
 }
 
 # Get value table values
-if ignore_str:
-    ignore_list = ignore_str.split(";")
-    for i in ignore_list:
-        i = i.replace("'", "")
-        if i in ignore_dict.keys():
-            ignore_dict[i] = True
-        else:
-            arcpy.AddWarning(f"{i} Ignore Property unknown")
+ignore_props = (
+    {i.replace("'", "") for i in ignore_str.split(";")} if ignore_str else set()
+)
+for i in sorted(ignore_props - ignore_dict.keys()):
+    arcpy.AddWarning(f"{i} Ignore Property unknown")
+for i in ignore_props & ignore_dict.keys():
+    ignore_dict[i] = True
 
 ignore_ds_alias = ignore_dict["Feature Class/Table Alias"]
 ignore_fld_alias = ignore_dict["Field Alias"]
@@ -1000,117 +946,109 @@ ignore_hasz = ignore_dict["Has Z"]
 ignore_domains = ignore_dict["Domains"]
 ignore_topology = ignore_dict["Topology"]
 
-# Parse xml files
-tree_base = etree.parse(xml_file_base)
-tree_test = etree.parse(xml_file_test)
-
-
-# Open new excel spreadsheet
-wb = openpyxl.Workbook()
-wb.remove(wb["Sheet"])
-save_wb = False
-
-
-# COMPARE FEATURE DATASETS
-log_it("Comparing feature datasets")
-fds_miss, fds_diff, fds_add = compare_fds(
-    tree_base, tree_test, "esri:DEFeatureDataset", "Feature Dataset"
-)
-if fds_miss or fds_diff or fds_add:
-    save_wb = True
-    write_results_to_xls(
-        wb, "Feature Datasets", "Feature Dataset", "Name", fds_miss, fds_diff, fds_add
-    )
-
-
-# COMPARE FEATURE CLASSES
-log_it("Comparing feature classes")
-fc_miss, fc_diff, fc_add = compare_datasets(
-    tree_base,
-    tree_test,
-    "esri:DEFeatureClass",
-    "Feature Class",
+# Extract the schema properties from each xml file in one streamed pass
+log_it("Reading schemas")
+ext_base = extract_all(
+    xml_file_base,
     ignore_ds_alias,
     ignore_fld_alias,
     ignore_hasm,
     ignore_hasz,
+    IGNORE_LEN_NON_TEXT_FIELDS,
 )
-if fc_miss or fc_diff or fc_add:
-    save_wb = True
-    write_results_to_xls(
-        wb, "Feature Classes", "Feature Class", "Name", fc_miss, fc_diff, fc_add
-    )
-
-
-# COMPARE TABLES
-log_it("Comparing tables")
-tbl_miss, tbl_diff, tbl_add = compare_datasets(
-    tree_base,
-    tree_test,
-    "esri:DETable",
-    "Table",
+ext_test = extract_all(
+    xml_file_test,
     ignore_ds_alias,
     ignore_fld_alias,
-    ignore_domains,
-)
-if tbl_miss or tbl_diff or tbl_add:
-    save_wb = True
-    write_results_to_xls(wb, "Tables", "Table", "Name", tbl_miss, tbl_diff, tbl_add)
-
-
-# COMPARE RELATIONSHIP CLASSES
-log_it("Comparing relationship classes")
-rc_miss, rc_diff, rc_add = compare_relationship_classes(
-    tree_base, tree_test, "esri:DERelationshipClass", "Relationship Class"
+    ignore_hasm,
+    ignore_hasz,
+    IGNORE_LEN_NON_TEXT_FIELDS,
 )
-if rc_miss or rc_diff or rc_add:
-    save_wb = True
-    write_results_to_xls(
-        wb,
-        "Relationship Classes",
-        "Relationship Class",
-        "Name",
-        rc_miss,
-        rc_diff,
-        rc_add,
-    )
-
 
+# Compare each category {category: (compare function, args)}, categories are
+# written to the excel file in this order
+compare_jobs = {
+    "Feature Datasets": (
+        compare_fds,
+        (
+            ext_base["esri:DEFeatureDataset"],
+            ext_test["esri:DEFeatureDataset"],
+            "Feature Dataset",
+        ),
+    ),
+    "Feature Classes": (
+        compare_datasets,
+        (
+            ext_base["esri:DEFeatureClass"],
+            ext_test["esri:DEFeatureClass"],
+            "Feature Class",
+        ),
+    ),
+    "Tables": (
+        compare_datasets,
+        (ext_base["esri:DETable"], ext_test["esri:DETable"], "Table"),
+    ),
+    "Relationship Classes": (
+        compare_relationship_classes,
+        (
+            ext_base["esri:DERelationshipClass"],
+            ext_test["esri:DERelationshipClass"],
+            "Relationship Class",
+        ),
+    ),
+}
 if not ignore_domains:
-    # COMPARE DOMAINS
-    log_it("Comparing domains")
-    domain_miss, domain_diff, domain_add = compare_domains(tree_base, tree_test)
-    if domain_miss or domain_diff or domain_add:
-        save_wb = True
-        write_results_to_xls(
-            wb, "Domains", "Domain", "DomainName", domain_miss, domain_diff, domain_add
-        )
-
-
-if not ignore_topology:
-    # COMPARE TOPOLOGIES
-    log_it("Comparing topologies")
-    topo_miss, topo_diff, topo_add = compare_topo(
-        tree_base, tree_test, "esri:DETopology", "Topology"
+    compare_jobs["Domains"] = (
+        compare_domains,
+        (ext_base["Domains"], ext_test["Domains"]),
     )
-    if topo_miss or topo_diff or topo_add:
-        save_wb = True
-        write_results_to_xls(
-            wb, "Topologies", "Topology", "Name", topo_miss, topo_diff, topo_add
-        )
-
-
-# COMPARE ATTRIBUTE RULES
-log_it("Comparing attribute rules")
-attr_miss, attr_diff, attr_add = compare_attr_rules(
-    tree_base, tree_test, ["esri:DEFeatureClass", "esri:DETable"], "Attribute Rules"
-)
-if attr_miss or attr_diff or attr_add:
-    save_wb = True
-    write_results_to_xls(
-        wb, "Attribute Rules", "Attribute Rule", "", attr_miss, attr_diff, attr_add
+# Topologies and attribute rules are only compared if either schema has any
+if not ignore_topology and (ext_base["esri:DETopology"] or ext_test["esri:DETopology"]):
+    compare_jobs["Topologies"] = (
+        compare_topo,
+        (
+            resolve_topo_rules(
+                ext_base["esri:DETopology"], ext_base["FeatureClassIDs"]
+            ),
+            resolve_topo_rules(
+                ext_test["esri:DETopology"], ext_test["FeatureClassIDs"]
+            ),
+            "Topology",
+        ),
+    )
+if ext_base["AttributeRules"] or ext_test["AttributeRules"]:
+    compare_jobs["Attribute Rules"] = (
+        compare_attr_rules,
+        (
+            ext_base["AttributeRules"],
+            ext_test["AttributeRules"],
+            "Attribute Rules",
+        ),
     )
+results = run_compares(compare_jobs)
+
+# Item type and name key written for each category {category: (type, key)}
+xls_items = {
+    "Feature Datasets": ("Feature Dataset", "Name"),
+    "Feature Classes": ("Feature Class", "Name"),
+    "Tables": ("Table", "Name"),
+    "Relationship Classes": ("Relationship Class", "Name"),
+    "Domains": ("Domain", "DomainName"),
+    "Topologies": ("Topology", "Name"),
+    "Attribute Rules": ("Attribute Rule", ""),
+}
 
+# Open new excel spreadsheet (write-only mode streams rows to disk as they
+# are appended)
+wb = openpyxl.Workbook(write_only=True)
+make_styles(wb, "header", "field")
+save_wb = False
+
+for category, (miss, diff, add) in results.items():
+    if miss or diff or add:
+        save_wb = True
+        item_type, dict_key = xls_items[category]
+        write_results_to_xls(wb, category, item_type, dict_key, miss, diff, add)
 
 if save_wb:
     log_it("Differences found.  Creating Diff xlsx.")
@@ -57,21 +57,13 @@ def log_it(message, level=0):
 
 
 def autofit_column_widths(ws):
-    for col in ws.columns:
-        max_length = 0
-        column = get_column_letter(
-            col[0].column
-        )  # Get column letter from the first cell in the column
-        for cell in col:
-            try:
-                if len(str(cell.value)) > max_length:
-                    max_length = len(str(cell.value))
-            except (
-                TypeError
-            ):  # Handle cases where cell.value might be None or not easily convertible to string
-                pass
+    # Read values only (no cell objects) and skip empty cells
+    for col_idx, col in enumerate(ws.iter_cols(values_only=True), 1):
+        max_length = max(
+            (len(str(value)) for value in col if value is not None), default=0
+        )
         adjusted_width = max_length + 2  # Add some padding
-        ws.column_dimensions[column].width = adjusted_width
+        ws.column_dimensions[get_column_letter(col_idx)].width = adjusted_width
 
 
 def is_default_val_out_of_range(default_val, minimum, maximum):
@@ -466,14 +458,14 @@ if ds_errors_dict:
                 ws[f"D{row}"] = e[0]
                 row += 1
 
-        # Apply autofit to column
-        autofit_column_widths(ws)
+    # Apply autofit to column
+    autofit_column_widths(ws)
 
-        # Save excel
-        wb.save(out_xls)
+    # Save excel once all datasets have been written
+    wb.save(out_xls)
 
-        # Start file
-        os.startfile(out_xls)
+    # Start file
+    os.startfile(out_xls)
 
 else:
     log_it("No errors were found in input file!")